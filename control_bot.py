@@ -6,7 +6,6 @@ import os
 import logging
 import asyncio
 import asyncpg
-import json
 from typing import Dict, List, Optional, Union
 from dotenv import load_dotenv
 from telegram import (
@@ -66,7 +65,18 @@ class TelegramControlBot:
     async def init_database(self):
         """Initialize database connection pool"""
         try:
-            self.db_pool = await asyncpg.create_pool(self.database_url, min_size=1, max_size=5)
+            self.db_pool = await asyncpg.create_pool(
+                self.database_url,
+                min_size=1,
+                max_size=5,
+                max_inactive_connection_lifetime=300,  # Recycle idle connections before the server drops them
+                command_timeout=30,
+                server_settings={
+                    'tcp_keepalives_idle': '60',
+                    'tcp_keepalives_interval': '30',
+                    'tcp_keepalives_count': '3'
+                }
+            )
             logger.info("Control bot database connection initialized")
             
             # Create command queue table
@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import sys
 import logging
 import asyncio
 import asyncpg
 import re
-from typing import Dict, List, Optional, Tuple, Union
+import time
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
 from dotenv import load_dotenv
 from telethon import TelegramClient, events, utils
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
 from telethon.sessions import StringSession
-from telethon.tl.types import MessageEntityCustomEmoji, User, Channel
+from telethon.tl.types import MessageEntityCustomEmoji, User, Channel, PeerChannel
 from custom_parse_mode import CustomParseMode
 
 # Load environment variables
@@ -27,6 +33,377 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+# Telethon's per-request INFO logs are too noisy for busy channels
+logging.getLogger('telethon').setLevel(logging.WARNING)
+
+# Forwarding task statements; asyncpg caches prepared statements per connection
+# keyed on query text, so every call site must reuse the exact same string
+_SQL_UPSERT_FORWARDING_TASK = """
+    INSERT INTO forwarding_tasks (source_channel_id, target_channel_id, description, delay_seconds, is_active)
+    VALUES ($1, $2, $3, $4, TRUE)
+    ON CONFLICT (source_channel_id, target_channel_id)
+    DO UPDATE SET is_active = TRUE, description = $3, delay_seconds = $4
+    RETURNING id
+"""
+_SQL_SET_FORWARDING_TASK_ACTIVE = "UPDATE forwarding_tasks SET is_active = $2 WHERE id = $1"
+# Returns the task's channels, or no row when the task does not exist
+_SQL_SET_FORWARDING_TASK_DELAY = """
+    UPDATE forwarding_tasks SET delay_seconds = $1 WHERE id = $2
+    RETURNING source_channel_id, target_channel_id
+"""
+# Shared by activate and deactivate so both reuse one cached prepared statement per connection
+_SQL_SET_REPLACEMENT_ACTIVE = "UPDATE monitored_channels SET replacement_active = $2 WHERE channel_id = $1"
+
+# Hot admin and emoji replacement statements, shared for the same reason
+# Inserts or reactivates an admin; returns no row when the user is already an active admin
+_SQL_UPSERT_ADMIN = """
+    INSERT INTO bot_admins (user_id, username, added_by, is_active)
+    VALUES ($1, $2, $3, TRUE)
+    ON CONFLICT (user_id)
+    DO UPDATE SET username = $2, added_by = $3, is_active = TRUE
+    WHERE bot_admins.is_active = FALSE
+    RETURNING user_id
+"""
+_SQL_DEACTIVATE_ADMIN = "UPDATE bot_admins SET is_active = FALSE WHERE user_id = $1"
+# Admin list rows with display defaults applied by the database
+_SQL_LIST_ADMINS = """
+    SELECT user_id,
+           COALESCE(NULLIF(username, ''), 'غير معروف') AS username,
+           COALESCE(NULLIF(added_by, 0)::text, 'النظام') AS added_by,
+           COALESCE(to_char(added_at, 'YYYY-MM-DD'), 'غير معروف') AS added_date
+    FROM bot_admins
+    WHERE is_active = TRUE
+    ORDER BY added_at
+"""
+_SQL_UPSERT_EMOJI_REPLACEMENT = """
+    INSERT INTO emoji_replacements (normal_emoji, premium_emoji_id, description)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (normal_emoji)
+    DO UPDATE SET premium_emoji_id = $2, description = $3
+"""
+_SQL_DELETE_EMOJI_REPLACEMENT = "DELETE FROM emoji_replacements WHERE normal_emoji = $1"
+
+_SQL_SELECT_EMOJI_MAPPINGS = "SELECT normal_emoji, premium_emoji_id FROM emoji_replacements"
+# Delete all but the newest row per emoji in one statement; returns the kept row
+# (deleted = FALSE) followed by the removed ones for every emoji that had duplicates
+_SQL_DELETE_DUPLICATE_EMOJI_REPLACEMENTS = """
+    WITH ranked AS (
+        SELECT ctid, normal_emoji, premium_emoji_id, created_at,
+               row_number() OVER (PARTITION BY normal_emoji ORDER BY created_at DESC) AS rn
+        FROM emoji_replacements
+    ), removed AS (
+        DELETE FROM emoji_replacements e
+        USING ranked r
+        WHERE e.ctid = r.ctid AND r.rn > 1
+        RETURNING e.normal_emoji, e.premium_emoji_id, e.created_at
+    )
+    SELECT normal_emoji, premium_emoji_id, created_at, FALSE AS deleted
+    FROM ranked
+    WHERE rn = 1 AND normal_emoji IN (SELECT normal_emoji FROM removed)
+    UNION ALL
+    SELECT normal_emoji, premium_emoji_id, created_at, TRUE AS deleted
+    FROM removed
+    ORDER BY normal_emoji, deleted, created_at DESC
+"""
+# Same dedupe when only the number of removed rows is needed
+_SQL_COUNT_DELETE_DUPLICATE_EMOJI_REPLACEMENTS = """
+    WITH ranked AS (
+        SELECT ctid, row_number() OVER (PARTITION BY normal_emoji ORDER BY created_at DESC) AS rn
+        FROM emoji_replacements
+    ), removed AS (
+        DELETE FROM emoji_replacements e
+        USING ranked r
+        WHERE e.ctid = r.ctid AND r.rn > 1
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM removed
+"""
+_SQL_UPSERT_CHANNEL_EMOJI_REPLACEMENT = """
+    INSERT INTO channel_emoji_replacements (channel_id, normal_emoji, premium_emoji_id, description)
+    VALUES ($1, $2, $3, $4)
+    ON CONFLICT (channel_id, normal_emoji)
+    DO UPDATE SET premium_emoji_id = $3, description = $4
+"""
+
+# Push notification for newly queued control-bot commands
+_COMMAND_QUEUE_CHANNEL = 'command_queue_new'
+_SQL_COMMAND_QUEUE_NOTIFY_TRIGGER = """
+    CREATE OR REPLACE FUNCTION notify_command_queue() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('command_queue_new', NEW.id::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+    DROP TRIGGER IF EXISTS command_queue_notify ON command_queue;
+    CREATE TRIGGER command_queue_notify AFTER INSERT ON command_queue
+        FOR EACH ROW EXECUTE FUNCTION notify_command_queue();
+"""
+
+# Admin rights shown in permission reports: (attribute, label, required for the bot)
+_PERMISSION_FIELDS = (
+    ('edit_messages', 'تعديل الرسائل', True),
+    ('delete_messages', 'حذف الرسائل', False),
+    ('post_messages', 'إرسال الرسائل', False),
+    ('add_admins', 'إضافة مشرفين', False),
+    ('ban_users', 'حظر المستخدمين', False),
+)
+
+# Exact entity type for custom emoji checks; Telethon TL types are never subclassed
+_MECE = MessageEntityCustomEmoji
+
+# Terminal marker in the command trie; never collides with a single text character
+_TRIE_END = ''
+
+# How long a Telegram channel lookup stays cached, in seconds
+_ENTITY_CACHE_TTL = 300
+
+# Maximum number of Telegram channel lookups kept, least recently used evicted first
+_ENTITY_CACHE_SIZE = 256
+
+# Reports reuse caches reloaded within this many seconds instead of reloading again
+_CACHE_REFRESH_TTL = 30
+
+# Built-in admin that is seeded into bot_admins and can never be removed
+_DEFAULT_ADMIN_ID = 6602517122
+
+# Fixed-size database pool, opened up front so no request pays connect latency.
+# Peak demand: the LISTEN connection, the single writer, the 5 concurrent cache
+# loaders of a sync and the other 3 of the 4 concurrently run queued commands.
+# Message copies never touch the pool.
+_DB_POOL_SIZE = 10
+
+# Maximum number of parsed markdown texts kept for reuse across edits and targets
+_PARSE_CACHE_SIZE = 2048
+
+# Claim a batch of pending commands in one round-trip, skipping rows another
+# processor has already locked
+_COMMAND_CLAIM_BATCH = 10
+_SQL_CLAIM_PENDING_COMMANDS = f"""
+    UPDATE command_queue SET status = 'processing'
+    WHERE id IN (
+        SELECT id FROM command_queue
+        WHERE status = 'pending'
+        ORDER BY created_at
+        LIMIT {_COMMAND_CLAIM_BATCH}
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *
+"""
+
+# Queued commands that only read state; consecutive ones may run concurrently,
+# every other command runs alone and in queue order
+_READ_ONLY_QUEUE_COMMANDS = frozenset((
+    'list_channels',
+    'check_channel_permissions',
+    'list_global_emojis',
+    'list_channel_emojis',
+    'list_channel_emoji_replacements',
+    'list_forwarding_tasks',
+    'list_admins',
+    'get_stats',
+    'test_connection',
+))
+
+# Mark a queued command completed; empty results get a generic success message
+_SQL_COMPLETE_COMMAND = """
+    UPDATE command_queue
+    SET status = 'completed',
+        result = COALESCE(NULLIF($1::text, ''), 'تم تنفيذ الأمر بنجاح'),
+        processed_at = CURRENT_TIMESTAMP
+    WHERE id = $2
+"""
+
+# Queued command results longer than this are cut to fit a Telegram message
+_RESULT_MAX_LENGTH = 3000
+_RESULT_TRUNCATE_AT = 2900
+_RESULT_TRUNCATED_SUFFIX = "\n\n... (النتيجة مقطوعة للطول)"
+
+# Emoji and symbol code points that replacements can target. Kept as explicit
+# stdlib re ranges rather than \p{Extended_Pictographic} from the third-party
+# `regex` package: the set also covers bullets, arrows and geometric symbols that
+# are not emoji, and it is compiled once at import.
+_EMOJI_CHAR_CLASS = (
+    r"\U0001F600-\U0001F64F"  # emoticons
+    r"\U0001F300-\U0001F5FF"   # symbols & pictographs
+    r"\U0001F680-\U0001F6FF"   # transport & map
+    r"\U0001F1E0-\U0001F1FF"   # flags (iOS)
+    r"\U00002700-\U000027BF"   # dingbats
+    r"\U0001F900-\U0001F9FF"   # supplemental symbols
+    r"\U00002600-\U000026FF"   # miscellaneous symbols
+    r"\U0001F170-\U0001F251"   # enclosed characters
+    r"\U0001F7E0-\U0001F7FF"   # geometric shapes extended
+    r"\U00002190-\U000021FF"   # arrows
+    r"\U00002100-\U0000214F"   # letterlike symbols
+    r"\U00002150-\U0000218F"   # number forms
+    r"\U00002460-\U000024FF"   # enclosed alphanumerics
+    r"\U000025A0-\U000025FF"   # geometric shapes
+    r"\U00002B00-\U00002BFF"   # miscellaneous symbols and arrows
+    r"\U0001F004"              # mahjong tile red dragon
+    r"\U0001F0CF"              # playing card black joker
+    r"\U0001F18E"              # negative squared ab
+    r"\U0001F191-\U0001F19A"   # squared symbols
+    r"\U0001F1E6-\U0001F1FF"   # regional indicator symbols
+    r"\U0001F201-\U0001F202"   # squared symbols
+    r"\U0001F21A"              # squared cjk unified ideograph-7121
+    r"\U0001F22F"              # squared cjk unified ideograph-6307
+    r"\U0001F232-\U0001F23A"   # squared symbols
+    r"\U0001F250-\U0001F251"   # circled symbols
+    # Common punctuation and symbols that users might want to replace
+    r"\U00002022"              # bullet point •
+    r"\U00002023"              # triangular bullet ‣
+    r"\U00002043"              # hyphen bullet ⁃
+    r"\U0000204C"              # black leftwards bullet ⁌
+    r"\U0000204D"              # black rightwards bullet ⁍
+    r"\U000025E6"              # white bullet ◦
+    r"\U00002219"              # bullet operator ∙
+    r"\U000000B7"              # middle dot ·
+    r"\U000025AA"              # black small square ▪
+    r"\U000025AB"              # white small square ▫
+    r"\U000025B6"              # black right-pointing triangle ▶
+    r"\U000025C0"              # black left-pointing triangle ◀
+    r"\U000025CF"              # black circle ●
+    r"\U000025CB"              # white circle ○
+    r"\U000025A0"              # black square ■
+    r"\U000025A1"              # white square □
+    r"\U00002713"              # check mark ✓
+    r"\U00002714"              # heavy check mark ✔
+    r"\U00002717"              # ballot x ✗
+    r"\U00002718"              # heavy ballot x ✘
+    r"\U0000274C"              # cross mark ❌
+    r"\U00002705"              # white heavy check mark ✅
+    r"\U0000274E"              # negative squared cross mark ❎
+    r"\U000027A1"              # black rightwards arrow ➡
+    r"\U00002B05"              # leftwards black arrow ⬅
+    r"\U00002B06"              # upwards black arrow ⬆
+    r"\U00002B07"              # downwards black arrow ⬇
+    r"\U000021A9"              # leftwards arrow with hook ↩
+    r"\U000021AA"              # rightwards arrow with hook ↪
+)
+# A symbol with optional variation selector, optionally joined (ZWJ) to a second one
+_EMOJI_PATTERN = re.compile(
+    "(["
+    + _EMOJI_CHAR_CLASS
+    + r"][\U0000FE00-\U0000FE0F]?"  # optional variation selectors
+    + r"(?:\U0000200D["  # zero-width joiner (for compound emojis)
+    + _EMOJI_CHAR_CLASS
+    + r"][\U0000FE00-\U0000FE0F]?)?"  # optional second emoji component with variation selector
+    + ")",
+    flags=re.UNICODE
+)
+# Common symbols double-checked character by character after the regex pass
+_FALLBACK_SYMBOLS = frozenset((
+    '•',  # bullet point
+    '◦',  # white bullet
+    '▪',  # black small square
+    '▫',  # white small square
+    '●',  # black circle
+    '○',  # white circle
+    '■',  # black square
+    '□',  # white square
+    '✓',  # check mark
+    '✔',  # heavy check mark
+    '✗',  # ballot x
+    '✘',  # heavy ballot x
+    '❌',  # cross mark
+    '✅',  # white heavy check mark
+    '❎',  # negative squared cross mark
+    '➡',  # black rightwards arrow
+    '⬅',  # leftwards black arrow
+    '⬆',  # upwards black arrow
+    '⬇',  # downwards black arrow
+    '↩',  # leftwards arrow with hook
+    '↪',  # rightwards arrow with hook
+    '·',  # middle dot
+    '∙',  # bullet operator
+))
+
+# Premium emoji markdown in command responses, and its plain-text stand-in
+_PREMIUM_EMOJI_MD_RE = re.compile(r"\[💎\]\(emoji/(\d+)\)")
+_PREMIUM_EMOJI_PLACEHOLDER = "إيموجي مميز"
+
+# Characters that must appear in text for any markdown syntax to be present
+_MD_TRIGGERS = frozenset('*_~`[')
+# Markdown markers understood by the parse mode: bold, italic, strike and code;
+# links are checked separately with plain substring tests
+_MARKDOWN_RE = re.compile(r'\*\*|__|~~|`')
+
+# One add-command line: normal emoji(s), premium emoji or ID, optional description.
+# Blank lines match with empty groups so match order stays aligned with line numbers.
+_LINE_RE = re.compile(r'^[^\S\n]*(?:(\S+)(?:[^\S\n]+(\S+)(?:[^\S\n]+(.*?))?)?)?[^\S\n]*$', re.MULTILINE)
+
+# Replacement status shown per channel in list responses
+_REPLACEMENT_STATUS_LABEL = {True: "✅ مُفعل", False: "❌ مُعطل"}
+
+# Static command responses, built once instead of on every invocation
+_ADD_USAGE_HELP = """
+📋 الاستخدام: إضافة_استبدال
+
+🔸 استبدال واحد:
+إضافة_استبدال <إيموجي_عادي> <إيموجي_مميز> [وصف]
+
+🔸 عدة إيموجيات عادية لإيموجي مميز واحد:
+إضافة_استبدال ✅,🟢,☑️ <إيموجي_مميز> [وصف]
+
+🔸 عدة استبدالات (كل سطر منفصل):
+إضافة_استبدال
+😀 🔥 وصف أول
+❤️,💖,💕 1234567890 وصف ثاني
+✅ ✨ وصف ثالث
+
+🔸 الرد على رسالة:
+رد على رسالة تحتوي على إيموجيات عادية ومميزة بـ "إضافة_استبدال [وصف]"
+
+💡 يمكنك استخدام الإيموجي المميز مباشرة أو معرفه الرقمي
+💡 فصل الإيموجيات العادية بفاصلة (,) لربطها بنفس الإيموجي المميز
+""".strip()
+_DELETE_ALL_WARN_TEMPLATE = """
+⚠️ تحذير: هذا الأمر سيحذف جميع الاستبدالات العامة!
+
+📊 الاستبدالات الحالية: {} استبدال
+
+🔴 لتأكيد الحذف، أرسل:
+حذف_جميع_الاستبدالات تأكيد
+
+💡 يمكنك استخدام أمر "عرض_الاستبدالات" لرؤية القائمة قبل الحذف
+""".strip()
+
+
+@lru_cache(maxsize=4096)
+def _channel_peer_id(channel_id: int) -> int:
+    """Marked peer id (-100...) for a raw channel id"""
+    return utils.get_peer_id(PeerChannel(channel_id))
+
+
+def _utf16_len(text: str) -> int:
+    """Length of text in UTF-16 code units, the unit Telegram entity offsets use"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _premium_markdown_to_entities(text: str) -> Tuple[str, list]:
+    """Turn [💎](emoji/ID) links into plain 💎 plus custom emoji entities, without a markdown parse"""
+    parts = []
+    entities = []
+    pos = 0
+    offset = 0
+    for match in _PREMIUM_EMOJI_MD_RE.finditer(text):
+        chunk = text[pos:match.start()]
+        parts.append(chunk)
+        parts.append("💎")
+        offset += _utf16_len(chunk)
+        entities.append(MessageEntityCustomEmoji(offset=offset, length=2, document_id=int(match.group(1))))
+        offset += 2  # 💎 is one astral code point: two UTF-16 units
+        pos = match.end()
+    parts.append(text[pos:])
+    return "".join(parts), entities
+
+
+def _needs_markdown_parse(text: str) -> bool:
+    """Check if text contains markdown-style formatting that needs parsing"""
+    if _MD_TRIGGERS.isdisjoint(text):
+        return False
+    return (_MARKDOWN_RE.search(text) is not None or
+            '[' in text and '](' in text)
+
 
 class TelegramEmojiBot:
     """
@@ -56,21 +433,47 @@ class TelegramEmojiBot:
         # Database connection pool
         self.db_pool: Optional[asyncpg.Pool] = None
         
+        # Command queue wake-up signal fed by LISTEN/NOTIFY
+        self._command_queue_event = asyncio.Event()
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._queue_processor_task: Optional[asyncio.Task] = None
+        self._cmd_sem = asyncio.Semaphore(4)  # Caps concurrently executing queued commands
+        
+        # Queued command writes run one at a time, in submission order
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        
         # Custom parse mode for premium emojis
         self.parse_mode = CustomParseMode('markdown')
+        self._parse_cache: Dict[str, Tuple[str, tuple]] = {}  # Bounded markdown text -> (text, entities)
         
         # Cache for emoji mappings and monitored channels
         self.emoji_mappings: Dict[str, int] = {}  # Global replacements
         self.channel_emoji_mappings: Dict[int, Dict[str, int]] = {}  # Channel-specific replacements
+        self._channel_mapping_total = 0  # Sum of per-channel mapping counts, kept in step with channel_emoji_mappings
+        self._merged_mappings: Dict[int, Dict[str, int]] = {}  # Channel overlay on top of global replacements
+        self._list_cache: Optional[str] = None  # Rendered global replacements list, reset on any global change
+        self._last_cache_refresh = 0.0  # time.monotonic() of the last full load_cached_data()
         self.monitored_channels: Dict[int, Dict[str, str]] = {}
+        self._monitored_ids: frozenset = frozenset()  # Hot-path membership snapshot of monitored_channels
+        self._channels_by_username: Dict[str, int] = {}  # Lowercased username -> monitored channel_id
+        self._entity_cache: Dict[str, Tuple[float, Tuple[int, Optional[str], str]]] = {}  # LRU of resolved channel lookups
         self.channel_replacement_status: Dict[int, bool] = {}  # Channel replacement activation status
+        self._active_replacement_count = 0  # Number of True entries in channel_replacement_status
         
         # Cache for forwarding tasks
         self.forwarding_tasks: Dict[int, Dict[str, Union[int, bool]]] = {}  # task_id -> {source, target, active}
+        self._active_sources: Set[int] = set()  # Source channels with at least one active task
+        self._delayed_task_count = 0  # Cached forwarding tasks with a non-zero delay
+        self._send_sem = asyncio.Semaphore(4)  # Caps concurrent copies to limit flood-wait risk
+        self._edit_sem = asyncio.Semaphore(8)  # Caps concurrent premium emoji edits across channel bursts
         
         # Cache for admin list and session owner
-        self.admin_ids: set = {6602517122}  # Default admin
+        self.admin_ids: set = {_DEFAULT_ADMIN_ID}  # Default admin
         self.userbot_admin_id: Optional[int] = None  # Will be set after getting bot info
+        self._me = None  # Session owner's User object, fetched once and reused
+        self._authorized_ids: frozenset = frozenset(self.admin_ids)  # Admins plus session owner, for authorization checks
+        self._protected_admins: frozenset = frozenset((_DEFAULT_ADMIN_ID,))  # Default admin plus session owner, never removable
         
         # Arabic command mappings - ordered by length (longest first) to avoid conflicts
         self.arabic_commands = {
@@ -119,37 +522,201 @@ class TelegramEmojiBot:
             'emoji_id': 'get_emoji_id',
             'stats': 'help_command'
         }
+        # Intern command names so dispatch lookups can match on identity
+        self.arabic_commands = {sys.intern(k): v for k, v in self.arabic_commands.items()}
+        
+        # Bound handlers keyed by bare and slash-prefixed command, plus a character trie
+        # over the same names for longest-prefix dispatch
+        self._cmd_handlers: Dict[str, Callable] = {}
+        self._cmd_trie: dict = {}
+        for arabic_cmd, handler_name in self.arabic_commands.items():
+            handler = getattr(self, f"cmd_{handler_name}", None)
+            if handler is None:
+                continue
+            for name in (arabic_cmd, sys.intern('/' + arabic_cmd)):
+                self._cmd_handlers[name] = handler
+                node = self._cmd_trie
+                for ch in name:
+                    node = node.setdefault(ch, {})
+                node[_TRIE_END] = handler
+        
+        # Control bot queue commands -> (handler, takes args)
+        self._queue_handlers = {
+            # Channel management commands
+            'list_channels': (self.get_channels_list, False),
+            'add_channel': (self.handle_add_channel_command, True),
+            'remove_channel': (self.handle_remove_channel_command, True),
+            'check_channel_permissions': (self.handle_check_permissions_command, True),
+            # Emoji management commands
+            'list_global_emojis': (self.get_global_emojis_list, False),
+            'list_channel_emojis': (self.handle_list_channel_emojis_command, True),
+            'add_emoji_replacement': (self.handle_add_emoji_command, True),
+            'delete_emoji_replacement': (self.handle_delete_emoji_command, True),
+            'clean_duplicates': (self.handle_clean_duplicates_command, False),
+            # Channel-specific emoji commands
+            'add_channel_emoji_replacement': (self.handle_add_channel_emoji_command, True),
+            'list_channel_emoji_replacements': (self.handle_list_channel_emoji_command, True),
+            'activate_channel_replacement': (self.handle_activate_channel_replacement_command, True),
+            'deactivate_channel_replacement': (self.handle_deactivate_channel_replacement_command, True),
+            # Forwarding task commands
+            'list_forwarding_tasks': (self.get_forwarding_tasks_list, False),
+            'add_forwarding_task': (self.handle_add_forwarding_task_command, True),
+            'delete_forwarding_task': (self.handle_delete_forwarding_task_command, True),
+            'activate_forwarding_task': (self.handle_activate_forwarding_task_command, True),
+            'deactivate_forwarding_task': (self.handle_deactivate_forwarding_task_command, True),
+            'update_forwarding_delay': (self.handle_update_forwarding_delay_command, True),
+            # Admin management commands
+            'list_admins': (self.get_admins_list, False),
+            'add_admin': (self.handle_add_admin_command, True),
+            'remove_admin': (self.handle_remove_admin_command, True),
+            # System commands
+            'get_stats': (self.get_system_stats, False),
+            'test_connection': (self.test_system_connection, False),
+            'sync_data': (self.sync_system_data, False),
+            'detailed_report': (self.get_detailed_system_report, False),
+        }
 
     async def init_database(self):
         """Initialize database connection pool"""
         try:
-            self.db_pool = await asyncpg.create_pool(self.database_url, min_size=1, max_size=10)
+            self.db_pool = await asyncpg.create_pool(
+                self.database_url,
+                min_size=_DB_POOL_SIZE,
+                max_size=_DB_POOL_SIZE,
+                max_inactive_connection_lifetime=0,  # Keep idle connections open; TCP keepalives catch dead ones
+                statement_cache_size=1024,  # Keep hot prepared statements cached per connection
+                command_timeout=30,
+                server_settings={
+                    'tcp_keepalives_idle': '60',
+                    'tcp_keepalives_interval': '30',
+                    'tcp_keepalives_count': '3'
+                }
+            )
             logger.info("Database connection pool initialized successfully")
             
+            # Create tables once, loaders below only read
+            await self.init_schema()
+            
             # Load cached data
-            await self.load_emoji_mappings()
-            await self.load_channel_emoji_mappings()
-            await self.load_monitored_channels()
-            await self.load_forwarding_tasks()
-            await self.load_admin_ids()
+            await self.load_cached_data()
             
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
 
+    async def _with_conn(self, fn: Callable[[asyncpg.Connection], Awaitable]):
+        """Run fn on one pooled connection inside a single transaction"""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                return await fn(conn)
+
+    async def load_cached_data(self, return_exceptions: bool = False) -> list:
+        """Reload every in-memory cache; the loaders are independent so run them concurrently"""
+        results = await asyncio.gather(
+            self.load_emoji_mappings(),
+            self.load_channel_emoji_mappings(),
+            self.load_monitored_channels(),
+            self.load_forwarding_tasks(),
+            self.load_admin_ids(),
+            return_exceptions=return_exceptions
+        )
+        self._last_cache_refresh = time.monotonic()
+        return results
+
+    async def init_schema(self):
+        """Create or migrate the tables owned by the userbot (run once at startup)"""
+        # Each table is best-effort: a failure is logged and the rest still run
+        async with self.db_pool.acquire() as conn:
+            try:
+                # Create channel_emoji_replacements table if it doesn't exist
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS channel_emoji_replacements (
+                        id SERIAL PRIMARY KEY,
+                        channel_id BIGINT NOT NULL,
+                        normal_emoji TEXT NOT NULL,
+                        premium_emoji_id BIGINT NOT NULL,
+                        description TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(channel_id, normal_emoji)
+                    )
+                """)
+            except Exception as e:
+                logger.error(f"Failed to create channel_emoji_replacements table: {e}")
+            
+            try:
+                # Add replacement_active column if it doesn't exist; monitored_channels
+                # itself is created by init_database.py, which may not have run yet
+                await conn.execute("""
+                    ALTER TABLE monitored_channels 
+                    ADD COLUMN IF NOT EXISTS replacement_active BOOLEAN DEFAULT TRUE
+                """)
+            except Exception as e:
+                logger.error(f"Failed to migrate monitored_channels table: {e}")
+            
+            try:
+                # Create forwarding_tasks table if it doesn't exist
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS forwarding_tasks (
+                        id SERIAL PRIMARY KEY,
+                        source_channel_id BIGINT NOT NULL,
+                        target_channel_id BIGINT NOT NULL,
+                        is_active BOOLEAN DEFAULT TRUE,
+                        description TEXT,
+                        delay_seconds INTEGER DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(source_channel_id, target_channel_id)
+                    )
+                """)
+                
+                # Add delay_seconds column if it doesn't exist
+                await conn.execute("""
+                    ALTER TABLE forwarding_tasks 
+                    ADD COLUMN IF NOT EXISTS delay_seconds INTEGER DEFAULT 0
+                """)
+            except Exception as e:
+                logger.error(f"Failed to create forwarding_tasks table: {e}")
+            
+            try:
+                # Create admins table if it doesn't exist
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_admins (
+                        id SERIAL PRIMARY KEY,
+                        user_id BIGINT UNIQUE NOT NULL,
+                        username TEXT,
+                        added_by BIGINT,
+                        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        is_active BOOLEAN DEFAULT TRUE
+                    )
+                """)
+                
+                # Add default admin if not exists
+                await conn.execute("""
+                    INSERT INTO bot_admins (user_id, username, added_by, is_active) 
+                    VALUES ($1, 'Default Admin', $1, TRUE) 
+                    ON CONFLICT (user_id) DO NOTHING
+                """, _DEFAULT_ADMIN_ID)
+            except Exception as e:
+                logger.error(f"Failed to create bot_admins table: {e}")
+        
+        logger.info("Database schema initialized")
+
     async def load_emoji_mappings(self):
         """Load emoji mappings from database into cache"""
         if self.db_pool is None:
             logger.error("Database pool not initialized")
             return
         try:
-            async with self.db_pool.acquire() as conn:
-                rows = await conn.fetch("SELECT normal_emoji, premium_emoji_id FROM emoji_replacements")
-                self.emoji_mappings = {row['normal_emoji']: row['premium_emoji_id'] for row in rows}
-                logger.info(f"Loaded {len(self.emoji_mappings)} emoji mappings from database")
+            self._set_emoji_mappings(await self.db_pool.fetch(_SQL_SELECT_EMOJI_MAPPINGS))
         except Exception as e:
             logger.error(f"Failed to load emoji mappings: {e}")
 
+    def _set_emoji_mappings(self, rows):
+        """Replace the emoji mapping cache with freshly fetched rows"""
+        self.emoji_mappings = {row['normal_emoji']: row['premium_emoji_id'] for row in rows}
+        self._invalidate_merged_mappings()
+        self._list_cache = None
+        logger.info(f"Loaded {len(self.emoji_mappings)} emoji mappings from database")
+
     async def load_channel_emoji_mappings(self):
         """Load channel-specific emoji mappings from database into cache"""
         if self.db_pool is None:
@@ -157,29 +724,15 @@ class TelegramEmojiBot:
             return
         try:
             async with self.db_pool.acquire() as conn:
-                # Create channel_emoji_replacements table if it doesn't exist
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS channel_emoji_replacements (
-                        id SERIAL PRIMARY KEY,
-                        channel_id BIGINT NOT NULL,
-                        normal_emoji TEXT NOT NULL,
-                        premium_emoji_id BIGINT NOT NULL,
-                        description TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(channel_id, normal_emoji)
-                    )
-                """)
-                
                 rows = await conn.fetch("SELECT channel_id, normal_emoji, premium_emoji_id FROM channel_emoji_replacements")
-                self.channel_emoji_mappings = {}
-                for row in rows:
-                    channel_id = row['channel_id']
-                    if channel_id not in self.channel_emoji_mappings:
-                        self.channel_emoji_mappings[channel_id] = {}
-                    self.channel_emoji_mappings[channel_id][row['normal_emoji']] = row['premium_emoji_id']
-                
-                total_mappings = sum(len(mappings) for mappings in self.channel_emoji_mappings.values())
-                logger.info(f"Loaded {total_mappings} channel-specific emoji mappings for {len(self.channel_emoji_mappings)} channels")
+                mappings: Dict[int, Dict[str, int]] = defaultdict(dict)
+                for channel_id, normal_emoji, premium_emoji_id in rows:
+                    mappings[channel_id][normal_emoji] = premium_emoji_id
+                self.channel_emoji_mappings = dict(mappings)
+                self._channel_mapping_total = sum(map(len, self.channel_emoji_mappings.values()))
+                self._invalidate_merged_mappings()
+                
+                logger.info(f"Loaded {self._channel_mapping_total} channel-specific emoji mappings for {len(self.channel_emoji_mappings)} channels")
         except Exception as e:
             logger.error(f"Failed to load channel emoji mappings: {e}")
 
@@ -190,12 +743,6 @@ class TelegramEmojiBot:
             return
         try:
             async with self.db_pool.acquire() as conn:
-                # Add replacement_active column if it doesn't exist
-                await conn.execute("""
-                    ALTER TABLE monitored_channels 
-                    ADD COLUMN IF NOT EXISTS replacement_active BOOLEAN DEFAULT TRUE
-                """)
-                
                 rows = await conn.fetch(
                     "SELECT channel_id, channel_username, channel_title, replacement_active FROM monitored_channels WHERE is_active = TRUE"
                 )
@@ -206,6 +753,7 @@ class TelegramEmojiBot:
                     }
                     for row in rows
                 }
+                self._reindex_monitored_channels()
                 
                 # Load replacement activation status
                 self.channel_replacement_status = {
@@ -213,12 +761,55 @@ class TelegramEmojiBot:
                     for row in rows
                 }
                 
+                self._active_replacement_count = sum(1 for active in self.channel_replacement_status.values() if active)
+                
                 logger.info(f"Loaded {len(self.monitored_channels)} monitored channels from database")
-                active_replacements = sum(1 for active in self.channel_replacement_status.values() if active)
-                logger.info(f"Replacement active in {active_replacements} channels")
+                logger.info(f"Replacement active in {self._active_replacement_count} channels")
         except Exception as e:
             logger.error(f"Failed to load monitored channels: {e}")
 
+    def _set_replacement_status(self, channel_id: int, active: bool):
+        """Record a channel's replacement flag, keeping the active count in step"""
+        self._active_replacement_count += active - bool(self.channel_replacement_status.get(channel_id))
+        self.channel_replacement_status[channel_id] = active
+
+    def _reindex_monitored_channels(self):
+        """Rebuild lookup indexes derived from monitored_channels"""
+        self._monitored_ids = frozenset(self.monitored_channels)
+        self._channels_by_username = {
+            channel_info['username'].lower(): channel_id
+            for channel_id, channel_info in self.monitored_channels.items()
+            if channel_info.get('username')
+        }
+
+    def _invalidate_merged_mappings(self, channel_id: Optional[int] = None):
+        """Drop cached merged mappings for one channel, or for all channels when global ones change"""
+        if channel_id is None:
+            self._merged_mappings.clear()
+        else:
+            self._merged_mappings.pop(channel_id, None)
+
+    def _get_merged_mappings(self, channel_id: int) -> Dict[str, int]:
+        """Return global replacements overlaid with the channel's own, building them once per change"""
+        mappings = self._merged_mappings.get(channel_id)
+        if mappings is None:
+            channel_mappings = self.channel_emoji_mappings.get(channel_id)
+            mappings = {**self.emoji_mappings, **channel_mappings} if channel_mappings else self.emoji_mappings
+            self._merged_mappings[channel_id] = mappings
+        return mappings
+
+    def _parse_markdown(self, text: str) -> Tuple[str, list]:
+        """Parse premium-emoji markdown, reusing the result for texts seen recently"""
+        cached = self._parse_cache.get(text)
+        if cached is None:
+            parsed_text, entities = self.parse_mode.parse(text)
+            if len(self._parse_cache) >= _PARSE_CACHE_SIZE:
+                # Evict the oldest entry
+                del self._parse_cache[next(iter(self._parse_cache))]
+            cached = self._parse_cache[text] = (parsed_text, tuple(entities))
+        # Hand out a fresh list so callers can't mutate the cached entities
+        return cached[0], list(cached[1])
+
     async def load_forwarding_tasks(self):
         """Load forwarding tasks from database into cache"""
         if self.db_pool is None:
@@ -226,26 +817,6 @@ class TelegramEmojiBot:
             return
         try:
             async with self.db_pool.acquire() as conn:
-                # Create forwarding_tasks table if it doesn't exist
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS forwarding_tasks (
-                        id SERIAL PRIMARY KEY,
-                        source_channel_id BIGINT NOT NULL,
-                        target_channel_id BIGINT NOT NULL,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        description TEXT,
-                        delay_seconds INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(source_channel_id, target_channel_id)
-                    )
-                """)
-                
-                # Add delay_seconds column if it doesn't exist
-                await conn.execute("""
-                    ALTER TABLE forwarding_tasks 
-                    ADD COLUMN IF NOT EXISTS delay_seconds INTEGER DEFAULT 0
-                """)
-                
                 rows = await conn.fetch(
                     "SELECT id, source_channel_id, target_channel_id, is_active, description, delay_seconds FROM forwarding_tasks WHERE is_active = TRUE"
                 )
@@ -260,12 +831,21 @@ class TelegramEmojiBot:
                         'description': row['description'] or '',
                         'delay': row['delay_seconds'] or 0
                     }
+                self._refresh_active_sources()
+                self._delayed_task_count = sum(1 for task in self.forwarding_tasks.values() if task['delay'] > 0)
                 
                 logger.info(f"Loaded {len(self.forwarding_tasks)} active forwarding tasks")
                 
         except Exception as e:
             logger.error(f"Failed to load forwarding tasks: {e}")
 
+    def _refresh_active_sources(self):
+        """Rebuild the set of source channels that have active forwarding tasks"""
+        self._active_sources = {
+            task_info['source'] for task_info in self.forwarding_tasks.values()
+            if task_info['active']
+        }
+
     async def add_forwarding_task(self, source_channel_id: int, target_channel_id: int, description: Optional[str] = None, delay_seconds: int = 0) -> bool:
         """Add forwarding task to database and cache"""
         if self.db_pool is None:
@@ -275,15 +855,13 @@ class TelegramEmojiBot:
             async with self.db_pool.acquire() as conn:
                 # Insert new forwarding task
                 task_id = await conn.fetchval(
-                    """INSERT INTO forwarding_tasks (source_channel_id, target_channel_id, description, delay_seconds, is_active) 
-                       VALUES ($1, $2, $3, $4, TRUE) 
-                       ON CONFLICT (source_channel_id, target_channel_id) 
-                       DO UPDATE SET is_active = TRUE, description = $3, delay_seconds = $4
-                       RETURNING id""",
+                    _SQL_UPSERT_FORWARDING_TASK,
                     source_channel_id, target_channel_id, description, delay_seconds
                 )
                 
                 # Update cache
+                previous = self.forwarding_tasks.get(task_id)
+                self._delayed_task_count += (delay_seconds > 0) - (previous is not None and previous['delay'] > 0)
                 self.forwarding_tasks[task_id] = {
                     'source': source_channel_id,
                     'target': target_channel_id,
@@ -291,6 +869,7 @@ class TelegramEmojiBot:
                     'description': description or '',
                     'delay': delay_seconds
                 }
+                self._active_sources.add(source_channel_id)
                 
                 logger.info(f"Added forwarding task: {source_channel_id} -> {target_channel_id} (delay: {delay_seconds}s)")
                 return True
@@ -305,20 +884,19 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return False
         try:
-            async with self.db_pool.acquire() as conn:
-                result = await conn.execute(
-                    "UPDATE forwarding_tasks SET is_active = FALSE WHERE id = $1",
-                    task_id
-                )
+            result = await self.db_pool.execute(_SQL_SET_FORWARDING_TASK_ACTIVE, task_id, False)
+            
+            if result == 'UPDATE 1':
+                # Update cache
+                removed = self.forwarding_tasks.pop(task_id, None)
+                if removed is not None and removed['delay'] > 0:
+                    self._delayed_task_count -= 1
+                self._refresh_active_sources()
+                logger.info(f"Deleted forwarding task: {task_id}")
+                return True
+            else:
+                return False
                 
-                if result == 'UPDATE 1':
-                    # Update cache
-                    self.forwarding_tasks.pop(task_id, None)
-                    logger.info(f"Deleted forwarding task: {task_id}")
-                    return True
-                else:
-                    return False
-                    
         except Exception as e:
             logger.error(f"Failed to delete forwarding task: {e}")
             return False
@@ -329,25 +907,22 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return False
         try:
-            async with self.db_pool.acquire() as conn:
-                result = await conn.execute(
-                    "UPDATE forwarding_tasks SET is_active = TRUE WHERE id = $1",
-                    task_id
-                )
-                
-                if result == 'UPDATE 1':
-                    # Update cache
-                    if task_id in self.forwarding_tasks:
-                        self.forwarding_tasks[task_id]['active'] = True
-                    else:
-                        # Reload from database if not in cache
-                        await self.load_forwarding_tasks()
-                    
-                    logger.info(f"Activated forwarding task: {task_id}")
-                    return True
+            result = await self.db_pool.execute(_SQL_SET_FORWARDING_TASK_ACTIVE, task_id, True)
+            
+            if result == 'UPDATE 1':
+                # Update cache
+                if task_id in self.forwarding_tasks:
+                    self.forwarding_tasks[task_id]['active'] = True
+                    self._refresh_active_sources()
                 else:
-                    return False
-                    
+                    # Reload from database if not in cache
+                    await self.load_forwarding_tasks()
+                
+                logger.info(f"Activated forwarding task: {task_id}")
+                return True
+            else:
+                return False
+                
         except Exception as e:
             logger.error(f"Failed to activate forwarding task: {e}")
             return False
@@ -358,70 +933,108 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return False
         try:
-            async with self.db_pool.acquire() as conn:
-                result = await conn.execute(
-                    "UPDATE forwarding_tasks SET is_active = FALSE WHERE id = $1",
-                    task_id
-                )
+            result = await self.db_pool.execute(_SQL_SET_FORWARDING_TASK_ACTIVE, task_id, False)
+            
+            if result == 'UPDATE 1':
+                # Update cache
+                if task_id in self.forwarding_tasks:
+                    self.forwarding_tasks[task_id]['active'] = False
+                    self._refresh_active_sources()
+                
+                logger.info(f"Deactivated forwarding task: {task_id}")
+                return True
+            else:
+                return False
                 
-                if result == 'UPDATE 1':
-                    # Update cache
-                    if task_id in self.forwarding_tasks:
-                        self.forwarding_tasks[task_id]['active'] = False
-                    
-                    logger.info(f"Deactivated forwarding task: {task_id}")
-                    return True
-                else:
-                    return False
-                    
         except Exception as e:
             logger.error(f"Failed to deactivate forwarding task: {e}")
             return False
 
     async def forward_message_to_targets(self, source_channel_id: int, message):
         """Copy message content to all target channels for this source"""
-        try:
-            # Find active forwarding tasks for this source channel
-            active_tasks = []
-            for task_id, task_info in self.forwarding_tasks.items():
-                if (task_info['source'] == source_channel_id and 
-                    task_info['active'] and 
-                    task_info['target'] in self.monitored_channels):
-                    active_tasks.append(task_info)
-            
-            if not active_tasks:
-                return
-            
-            logger.info(f"Found {len(active_tasks)} copying targets for channel {source_channel_id}")
-            
-            # Copy to each target
-            for task in active_tasks:
-                target_channel_id = task['target']
-                delay_seconds = task.get('delay', 0)
-                
-                # If there's a delay, schedule the copy operation
-                if delay_seconds > 0:
-                    logger.info(f"Scheduling delayed copy from {source_channel_id} to {target_channel_id} (delay: {delay_seconds}s)")
-                    asyncio.create_task(self._delayed_copy_message(
-                        source_channel_id, target_channel_id, message, delay_seconds
-                    ))
-                else:
-                    # Copy immediately
-                    await self._copy_message_to_target(source_channel_id, target_channel_id, message)
-            
-        except Exception as e:
-            logger.error(f"Failed to process copying for channel {source_channel_id}: {e}")
-
-    async def _delayed_copy_message(self, source_channel_id: int, target_channel_id: int, message, delay_seconds: int):
+        if source_channel_id not in self._active_sources:
+            return
+        # Find active forwarding tasks for this source channel
+        active_tasks = []
+        for task_id, task_info in self.forwarding_tasks.items():
+            if (task_info['source'] == source_channel_id and 
+                task_info['active'] and 
+                task_info['target'] in self._monitored_ids):
+                active_tasks.append(task_info)
+        
+        if not active_tasks:
+            return
+        
+        logger.info("Found %d copying targets for channel %s", len(active_tasks), source_channel_id)
+        
+        # Parse markdown once for all targets instead of once per target
+        prepared = None
+        text_content = message.text or message.message
+        if not message.media and text_content and _needs_markdown_parse(text_content):
+            try:
+                prepared = self._parse_markdown(text_content)
+            except Exception as parse_error:
+                logger.warning(f"Failed to pre-parse markdown for copying: {parse_error}")
+        
+        # Copy to each target
+        immediate_targets = []
+        for task in active_tasks:
+            target_channel_id = task['target']
+            delay_seconds = task.get('delay', 0)
+            
+            # If there's a delay, schedule the copy operation
+            if delay_seconds > 0:
+                logger.info("Scheduling delayed copy from %s to %s (delay: %ss)", source_channel_id, target_channel_id, delay_seconds)
+                asyncio.create_task(self._delayed_copy_message(
+                    source_channel_id, target_channel_id, message, delay_seconds, prepared
+                ))
+            else:
+                immediate_targets.append(target_channel_id)
+        
+        # Copy to all immediate targets concurrently
+        if immediate_targets:
+            results = await asyncio.gather(
+                *(self._copy_message_to_target(source_channel_id, target_channel_id, message, prepared)
+                  for target_channel_id in immediate_targets),
+                return_exceptions=True
+            )
+            for target_channel_id, result in zip(immediate_targets, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Failed to copy message {message.id} from {source_channel_id} to {target_channel_id}: {result!r}")
+
+    async def _delayed_copy_message(self, source_channel_id: int, target_channel_id: int, message, delay_seconds: int,
+                                    prepared: Optional[Tuple[str, list]] = None):
         """Copy message after delay"""
         try:
             await asyncio.sleep(delay_seconds)
-            await self._copy_message_to_target(source_channel_id, target_channel_id, message)
-            logger.info(f"Delayed copy completed from {source_channel_id} to {target_channel_id} after {delay_seconds}s")
+            await self._copy_message_to_target(source_channel_id, target_channel_id, message, prepared)
+            logger.info("Delayed copy completed from %s to %s after %ss", source_channel_id, target_channel_id, delay_seconds)
         except Exception as e:
             logger.error(f"Failed to perform delayed copy from {source_channel_id} to {target_channel_id}: {e}")
 
-    async def _copy_message_to_target(self, source_channel_id: int, target_channel_id: int, message):
+    async def _copy_message_to_target(self, source_channel_id: int, target_channel_id: int, message,
+                                      prepared: Optional[Tuple[str, list]] = None):
+        """Copy message to target channel, bounded by the shared send semaphore"""
+        async with self._send_sem:
+            await self._copy_message_content(source_channel_id, target_channel_id, message, prepared)
+
+    async def _send_media(self, target_channel_id: int, message, caption: Optional[str] = None, entities: Optional[list] = None):
+        """Send the media of a message to target channel with optional caption and entities"""
+        send_file_kwargs = {
+            'entity': target_channel_id,
+            'file': message.media,
+            'supports_streaming': True,
+            'force_document': False,  # Keep original media type
+            'parse_mode': None  # Use raw entities
+        }
+        if caption:
+            send_file_kwargs['caption'] = caption
+            if entities:
+                send_file_kwargs['formatting_entities'] = entities
+        await self.client.send_file(**send_file_kwargs)
+
+    async def _copy_message_content(self, source_channel_id: int, target_channel_id: int, message,
+                                    prepared: Optional[Tuple[str, list]] = None):
         """Copy message content to target channel with full formatting preservation"""
         try:
             # Check media messages first (including those with captions)
@@ -430,115 +1043,45 @@ class TelegramEmojiBot:
                 # Media message (photo, video, document, etc.)
                 caption = message.text or message.message or ""
                 
-                logger.info(f"Copying media message with caption: '{caption[:50]}...' if caption else 'No caption'")
-                logger.info(f"Media type: {type(message.media)}")
+                logger.debug("Copying media message with caption: %r", caption[:50] if caption else 'No caption')
+                logger.debug("Media type: %s", type(message.media))
                 
                 try:
-                    # Use send_file directly with message.media without downloading
-                    logger.info("Copying media file directly using send_file with message.media")
-                    logger.info(f"Media object type: {type(message.media).__name__}")
+                    # Use send_file directly with message.media without downloading.
+                    # Attempts go from full fidelity (caption + entities) down to media only.
+                    attempts = []
+                    if caption:
+                        if message.entities:
+                            attempts.append((caption, message.entities))
+                        attempts.append((caption, None))
+                    attempts.append((None, None))
                     
-                    # For media messages, always ensure we send the file WITH caption (if any)
-                    # Use a more robust approach to handle media with captions
+                    sent_caption = False
+                    for attempt_caption, attempt_entities in attempts:
+                        try:
+                            await self._send_media(target_channel_id, message, attempt_caption, attempt_entities)
+                            sent_caption = attempt_caption is not None
+                            break
+                        except Exception as send_error:
+                            logger.warning(f"send_file attempt failed (caption: {attempt_caption is not None}, entities: {attempt_entities is not None}): {send_error}")
+                    else:
+                        raise RuntimeError("All media sending methods failed")
                     
-                    try:
-                        # Primary method: Send file with all caption formatting preserved
-                        send_file_kwargs = {
-                            'entity': target_channel_id,
-                            'file': message.media,
-                            'supports_streaming': True,
-                            'force_document': False,  # Keep original media type
-                            'parse_mode': None  # Use raw entities
-                        }
-                        
-                        # Add caption and entities if they exist
-                        if caption:
-                            send_file_kwargs['caption'] = caption
-                            
-                            # Preserve all caption entities exactly as they are
-                            if message.entities:
-                                logger.info(f"Preserving {len(message.entities)} caption formatting entities")
-                                send_file_kwargs['formatting_entities'] = message.entities
-                            
-                            logger.info(f"Sending media with caption: '{caption[:50]}{'...' if len(caption) > 50 else ''}'")
-                        else:
-                            logger.info("Sending media without caption")
-                        
-                        # Send the file with all parameters
-                        await self.client.send_file(**send_file_kwargs)
-                        logger.info("Successfully sent media with preserved caption and formatting")
-                        
-                    except Exception as primary_error:
-                        logger.warning(f"Primary send_file method failed: {primary_error}")
-                        
-                        # Fallback 1: Try without entities but keep caption
-                        if caption:
-                            try:
-                                logger.info("Fallback: Sending media with caption but without entities")
-                                await self.client.send_file(
-                                    entity=target_channel_id,
-                                    file=message.media,
-                                    caption=caption,
-                                    supports_streaming=True,
-                                    force_document=False,
-                                    parse_mode=None
-                                )
-                                logger.info("Fallback 1 successful: media sent with caption (no entities)")
-                                
-                            except Exception as fallback1_error:
-                                logger.warning(f"Fallback 1 failed: {fallback1_error}")
-                                
-                                # Fallback 2: Try without caption
-                                try:
-                                    logger.info("Fallback 2: Sending media without caption")
-                                    await self.client.send_file(
-                                        entity=target_channel_id,
-                                        file=message.media,
-                                        supports_streaming=True,
-                                        force_document=False
-                                    )
-                                    logger.info("Fallback 2 successful: media sent without caption")
-                                    
-                                    # If media was sent successfully but without caption, send caption as separate message
-                                    if caption:
-                                        try:
-                                            await asyncio.sleep(0.5)  # Small delay
-                                            logger.info("Sending caption as separate message")
-                                            if message.entities:
-                                                await self.client.send_message(
-                                                    entity=target_channel_id,
-                                                    message=caption,
-                                                    formatting_entities=message.entities,
-                                                    parse_mode=None
-                                                )
-                                            else:
-                                                await self.client.send_message(
-                                                    entity=target_channel_id,
-                                                    message=caption
-                                                )
-                                            logger.info("Caption sent as separate message")
-                                        except Exception as caption_error:
-                                            logger.error(f"Failed to send caption as separate message: {caption_error}")
-                                    
-                                except Exception as fallback2_error:
-                                    logger.error(f"All media sending methods failed: {fallback2_error}")
-                                    raise fallback2_error
-                        else:
-                            # No caption, try sending media only
-                            try:
-                                logger.info("Fallback: Sending media without caption")
-                                await self.client.send_file(
-                                    entity=target_channel_id,
-                                    file=message.media,
-                                    supports_streaming=True,
-                                    force_document=False
-                                )
-                                logger.info("Media sent successfully without caption")
-                            except Exception as no_caption_error:
-                                logger.error(f"Failed to send media without caption: {no_caption_error}")
-                                raise no_caption_error
+                    # If media was sent successfully but without caption, send caption as separate message
+                    if caption and not sent_caption:
+                        try:
+                            await asyncio.sleep(0.5)  # Small delay
+                            logger.debug("Sending caption as separate message")
+                            await self.client.send_message(
+                                entity=target_channel_id,
+                                message=caption,
+                                formatting_entities=message.entities,
+                                parse_mode=None
+                            )
+                        except Exception as caption_error:
+                            logger.error(f"Failed to send caption as separate message: {caption_error}")
                     
-                    logger.info(f"Successfully sent media file to target channel using direct send_file")
+                    logger.debug("Successfully sent media file to target channel using direct send_file")
                 
                 except Exception as media_error:
                     logger.error(f"Error handling media file: {media_error}")
@@ -546,14 +1089,14 @@ class TelegramEmojiBot:
                     logger.error(f"Message ID: {message.id}")
                     
                     # Try direct forwarding as immediate fallback (no download/upload)
-                    logger.info("Trying direct forwarding as fallback (no file handling)")
+                    logger.debug("Trying direct forwarding as fallback (no file handling)")
                     try:
                         await self.client.forward_messages(
                             entity=target_channel_id,
                             messages=message,
                             from_peer=source_channel_id
                         )
-                        logger.info("Direct forwarding successful")
+                        logger.debug("Direct forwarding successful")
                     except Exception as forward_error:
                         logger.error(f"Direct forwarding also failed: {forward_error}")
                         # CRITICAL: Never send caption only without media
@@ -579,50 +1122,47 @@ class TelegramEmojiBot:
                 
                 # Check if the text contains markdown-style formatting (like **text**)
                 # that needs to be converted to proper Telegram entities
-                needs_markdown_parse = False
-                if ('**' in text_content or '__' in text_content or 
-                    '~~' in text_content or '`' in text_content or
-                    '[' in text_content and '](' in text_content):
-                    needs_markdown_parse = True
+                needs_markdown_parse = _needs_markdown_parse(text_content)
                 
                 # Preserve all entities exactly as they are to maintain complete formatting
                 if message.entities:
                     # Log the entities being preserved for debugging
-                    logger.info(f"Preserving {len(message.entities)} formatting entities for copying")
-                    premium_emoji_count = 0
-                    for entity in message.entities:
-                        entity_type = type(entity).__name__
-                        if isinstance(entity, MessageEntityCustomEmoji):
-                            premium_emoji_count += 1
-                            logger.info(f"  - Premium Emoji: {entity_type} at offset {entity.offset}, length {entity.length}, ID: {entity.document_id}")
-                        else:
-                            logger.debug(f"  - {entity_type} at offset {entity.offset}, length {entity.length}")
-                    
-                    logger.info(f"Copying message with {premium_emoji_count} premium emojis and {len(message.entities) - premium_emoji_count} other formatting entities")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Preserving {len(message.entities)} formatting entities for copying")
+                        premium_emoji_count = 0
+                        for entity in message.entities:
+                            entity_type = type(entity).__name__
+                            if type(entity) is _MECE:
+                                premium_emoji_count += 1
+                                logger.debug(f"  - Premium Emoji: {entity_type} at offset {entity.offset}, length {entity.length}, ID: {entity.document_id}")
+                            else:
+                                logger.debug(f"  - {entity_type} at offset {entity.offset}, length {entity.length}")
+                        
+                        logger.debug(f"Copying message with {premium_emoji_count} premium emojis and {len(message.entities) - premium_emoji_count} other formatting entities")
                     
                     # If the text still contains markdown syntax, parse it to get proper entities
                     if needs_markdown_parse:
                         try:
                             # Parse the text with markdown to get proper formatting entities
-                            parsed_text, parsed_entities = self.parse_mode.parse(text_content)
+                            parsed_text, parsed_entities = prepared or self._parse_markdown(text_content)
                             
                             # Merge existing custom emoji entities with new formatting entities
                             final_entities = []
                             
                             # Add custom emoji entities from the original message
                             for entity in message.entities:
-                                if isinstance(entity, MessageEntityCustomEmoji):
+                                if type(entity) is _MECE:
                                     final_entities.append(entity)
                             
                             # Add formatting entities from markdown parsing (but skip custom emojis to avoid duplicates)
                             for entity in parsed_entities:
-                                if not isinstance(entity, MessageEntityCustomEmoji):
+                                if type(entity) is not _MECE:
                                     final_entities.append(entity)
                             
                             # Sort entities by offset to maintain proper order
                             final_entities.sort(key=lambda e: e.offset)
                             
-                            logger.info(f"Parsed markdown and merged entities: {len(final_entities)} total entities")
+                            logger.debug("Parsed markdown and merged entities: %d total entities", len(final_entities))
                             
                             await self.client.send_message(
                                 entity=target_channel_id,
@@ -654,8 +1194,8 @@ class TelegramEmojiBot:
                     # No entities, but check if text has markdown that should be parsed
                     if needs_markdown_parse:
                         try:
-                            parsed_text, parsed_entities = self.parse_mode.parse(text_content)
-                            logger.info(f"Parsing markdown for text without entities: {len(parsed_entities)} entities found")
+                            parsed_text, parsed_entities = prepared or self._parse_markdown(text_content)
+                            logger.debug("Parsing markdown for text without entities: %d entities found", len(parsed_entities))
                             await self.client.send_message(
                                 entity=target_channel_id,
                                 message=parsed_text,
@@ -671,7 +1211,7 @@ class TelegramEmojiBot:
                             )
                     else:
                         # No entities and no markdown, send plain text
-                        logger.info("Copying plain text message (no formatting entities)")
+                        logger.debug("Copying plain text message (no formatting entities)")
                         await self.client.send_message(
                             entity=target_channel_id,
                             message=text_content,
@@ -680,7 +1220,7 @@ class TelegramEmojiBot:
             else:
                 # Handle other message types like stickers, animations, etc.
                 # This case should be rare since most content is either media or text
-                logger.info(f"Handling unknown message type: {type(message)}")
+                logger.debug("Handling unknown message type: %s", type(message))
                 try:
                     # Try direct forwarding for unknown message types
                     await self.client.forward_messages(
@@ -688,12 +1228,12 @@ class TelegramEmojiBot:
                         messages=message,
                         from_peer=source_channel_id
                     )
-                    logger.info("Successfully forwarded unknown message type")
+                    logger.debug("Successfully forwarded unknown message type")
                 except Exception as forward_error:
                     logger.error(f"Failed to forward unknown message type: {forward_error}")
                     return
             
-            logger.info(f"Successfully processed message from {source_channel_id} to {target_channel_id}")
+            logger.info("Successfully processed message from %s to %s", source_channel_id, target_channel_id)
             
         except Exception as copy_error:
             logger.error(f"Failed to copy message from {source_channel_id} to {target_channel_id}: {copy_error}")
@@ -704,16 +1244,30 @@ class TelegramEmojiBot:
             
             # Final fallback: try simple forwarding
             try:
-                logger.info("Attempting final fallback: simple forward")
+                logger.debug("Attempting final fallback: simple forward")
                 await self.client.forward_messages(
                     entity=target_channel_id,
                     messages=message,
                     from_peer=source_channel_id
                 )
-                logger.info("Final fallback forwarding successful")
+                logger.debug("Final fallback forwarding successful")
             except Exception as final_error:
                 logger.error(f"All copy methods failed: {final_error}")
 
+    async def _get_me_cached(self):
+        """Return the session owner's User, fetching it from Telegram only once"""
+        if self._me is None:
+            self._me = await self.client.get_me()
+        return self._me
+
+    def _refresh_authorized_ids(self):
+        """Rebuild the authorization snapshot from admin_ids and the session owner"""
+        authorized = set(self.admin_ids)
+        if self.userbot_admin_id is not None:
+            authorized.add(self.userbot_admin_id)
+            self._protected_admins = frozenset((_DEFAULT_ADMIN_ID, self.userbot_admin_id))
+        self._authorized_ids = frozenset(authorized)
+
     async def load_admin_ids(self):
         """Load admin IDs from database into cache"""
         if self.db_pool is None:
@@ -721,286 +1275,199 @@ class TelegramEmojiBot:
             return
         try:
             async with self.db_pool.acquire() as conn:
-                # Create admins table if it doesn't exist
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS bot_admins (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        username TEXT,
-                        added_by BIGINT,
-                        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        is_active BOOLEAN DEFAULT TRUE
-                    )
-                """)
-                
-                # Add default admin if not exists
-                await conn.execute("""
-                    INSERT INTO bot_admins (user_id, username, added_by, is_active) 
-                    VALUES ($1, 'Default Admin', $1, TRUE) 
-                    ON CONFLICT (user_id) DO NOTHING
-                """, 6602517122)
-                
                 # Load active admins
                 rows = await conn.fetch("SELECT user_id FROM bot_admins WHERE is_active = TRUE")
                 self.admin_ids = {row['user_id'] for row in rows}
+                self._refresh_authorized_ids()
                 logger.info(f"Loaded {len(self.admin_ids)} admin IDs from database")
         except Exception as e:
             logger.error(f"Failed to load admin IDs: {e}")
 
+    def _resolve_local(self, channel_identifier: str) -> Optional[int]:
+        """Match an ID or @username against monitored channels without contacting Telegram"""
+        if channel_identifier.isdigit() or (channel_identifier.startswith('-') and channel_identifier[1:].isdigit()):
+            channel_id = int(channel_identifier)
+            return channel_id if channel_id in self.monitored_channels else None
+        return self._channels_by_username.get(channel_identifier.removeprefix('@').lower())
+
     async def resolve_channel_identifier(self, channel_identifier: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
         """
         Resolve channel identifier (username or ID) to channel_id, username, and title
         Returns: (channel_id, username, title) or (None, None, None) if not found
         """
         try:
-            # If it's a numeric ID, try to convert it
-            if channel_identifier.isdigit() or (channel_identifier.startswith('-') and channel_identifier[1:].isdigit()):
-                channel_id = int(channel_identifier)
-                
-                # Check if it's already in monitored channels
-                if channel_id in self.monitored_channels:
-                    channel_info = self.monitored_channels[channel_id]
-                    return channel_id, channel_info.get('username'), channel_info.get('title')
-                
-                # Try to get entity to verify it exists
-                try:
-                    entity = await self.client.get_entity(channel_id)
-                    if isinstance(entity, Channel):
-                        peer_id = utils.get_peer_id(entity)
-                        return peer_id, getattr(entity, 'username', None), getattr(entity, 'title', 'Unknown Channel')
-                except:
-                    return None, None, None
+            # Check monitored channels first
+            channel_id = self._resolve_local(channel_identifier)
+            if channel_id is not None:
+                channel_info = self.monitored_channels[channel_id]
+                return channel_id, channel_info.get('username'), channel_info.get('title')
             
-            # If it's a username, resolve it
-            else:
-                # Remove @ if present
-                if channel_identifier.startswith('@'):
-                    channel_identifier = channel_identifier[1:]
-                
-                # Check monitored channels by username first
-                for channel_id, channel_info in self.monitored_channels.items():
-                    if channel_info.get('username') == channel_identifier:
-                        return channel_id, channel_info.get('username'), channel_info.get('title')
-                
-                # Try to get entity
-                try:
-                    entity = await self.client.get_entity(channel_identifier)
-                    if isinstance(entity, Channel):
-                        peer_id = utils.get_peer_id(entity)
-                        return peer_id, getattr(entity, 'username', None), getattr(entity, 'title', 'Unknown Channel')
-                except:
-                    return None, None, None
+            # If it's a numeric ID, try to get entity to verify it exists
+            if channel_identifier.isdigit() or (channel_identifier.startswith('-') and channel_identifier[1:].isdigit()):
+                return await self._fetch_channel_entity(int(channel_identifier))
             
-            return None, None, None
+            # Otherwise it's a username; remove @ if present and resolve it
+            return await self._fetch_channel_entity(channel_identifier.removeprefix('@'))
             
         except Exception as e:
             logger.error(f"Failed to resolve channel identifier {channel_identifier}: {e}")
             return None, None, None
 
+    async def _fetch_channel_entity(self, channel_identifier: Union[int, str]) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+        """Resolve a channel through Telegram, caching successful lookups for a short TTL"""
+        key = str(channel_identifier).lower()
+        cached = self._entity_cache.pop(key, None)
+        if cached is not None and time.monotonic() - cached[0] < _ENTITY_CACHE_TTL:
+            # Re-insert to mark it most recently used
+            self._entity_cache[key] = cached
+            return cached[1]
+        
+        try:
+            entity = await self.client.get_entity(channel_identifier)
+        except Exception:
+            return None, None, None
+        if not isinstance(entity, Channel):
+            return None, None, None
+        
+        resolved = (_channel_peer_id(entity.id), getattr(entity, 'username', None), getattr(entity, 'title', 'Unknown Channel'))
+        if len(self._entity_cache) >= _ENTITY_CACHE_SIZE:
+            # Evict the least recently used entry
+            del self._entity_cache[next(iter(self._entity_cache))]
+        self._entity_cache[key] = (time.monotonic(), resolved)
+        return resolved
+
+    def _invalidate_entity_cache(self, channel_id: int, channel_username: Optional[str] = None):
+        """Drop cached lookups for a channel whose monitoring state changed"""
+        self._entity_cache.pop(str(channel_id), None)
+        if channel_username:
+            self._entity_cache.pop(channel_username.lower(), None)
+
     async def format_permissions_text(self, permissions, channel_title: str, channel_username: str = None) -> str:
         """Format permissions text for display"""
         try:
             username_display = f"@{channel_username}" if channel_username else "بدون معرف"
             
-            permissions_text = f"""📺 **معلومات القناة:**
+            lines = [f"""📺 **معلومات القناة:**
 • الاسم: {channel_title}
 • المعرف: {username_display}
 
 👤 **حالة البوت:**
 • الدور: {"✅ مشرف" if permissions.is_admin else "❌ عضو عادي"}
 
-🔑 **الصلاحيات الحالية:**"""
+🔑 **الصلاحيات الحالية:**"""]
             
-            if permissions.is_admin:
-                # Check specific admin permissions
-                perm_list = []
-                
-                if hasattr(permissions, 'edit_messages') and permissions.edit_messages:
-                    perm_list.append("✅ تعديل الرسائل")
-                else:
-                    perm_list.append("❌ تعديل الرسائل")
-                
-                if hasattr(permissions, 'delete_messages') and permissions.delete_messages:
-                    perm_list.append("✅ حذف الرسائل")
-                else:
-                    perm_list.append("❌ حذف الرسائل")
-                
-                if hasattr(permissions, 'post_messages') and permissions.post_messages:
-                    perm_list.append("✅ إرسال الرسائل")
-                else:
-                    perm_list.append("❌ إرسال الرسائل")
-                
-                if hasattr(permissions, 'add_admins') and permissions.add_admins:
-                    perm_list.append("✅ إضافة مشرفين")
-                else:
-                    perm_list.append("❌ إضافة مشرفين")
-                
-                if hasattr(permissions, 'ban_users') and permissions.ban_users:
-                    perm_list.append("✅ حظر المستخدمين")
-                else:
-                    perm_list.append("❌ حظر المستخدمين")
-                
-                # Add permissions to text
-                for perm in perm_list:
-                    permissions_text += f"\n• {perm}"
-                
-                # Check if critical permissions are missing
-                critical_missing = []
-                if not (hasattr(permissions, 'edit_messages') and permissions.edit_messages):
-                    critical_missing.append("تعديل الرسائل")
-                
-                if critical_missing:
-                    permissions_text += f"\n\n⚠️ **صلاحيات مطلوبة مفقودة:**"
-                    for missing in critical_missing:
-                        permissions_text += f"\n• {missing}"
-                    permissions_text += f"\n\n💡 **تنبيه:** البوت يحتاج صلاحية 'تعديل الرسائل' للعمل بشكل صحيح"
-                else:
-                    permissions_text += f"\n\n✅ **جميع الصلاحيات المطلوبة متوفرة**"
-            
-            else:
-                permissions_text += "\n❌ البوت ليس مشرفاً - لا توجد صلاحيات إدارية"
-            
-            return permissions_text
-            
-        except Exception as e:
-            logger.error(f"Failed to format permissions text: {e}")
-            return f"❌ خطأ في عرض الصلاحيات: {e}"
-
-    async def process_command_queue(self):
-        """Process pending commands from control bot with enhanced error handling"""
-        if self.db_pool is None:
-            return
-        
-        try:
-            async with self.db_pool.acquire() as conn:
-                # Get pending commands
-                commands = await conn.fetch(
-                    "SELECT * FROM command_queue WHERE status = 'pending' ORDER BY created_at LIMIT 10"
-                )
-                
-                for cmd_row in commands:
-                    command_id = None
-                    try:
-                        command_id = cmd_row['id']
-                        command = cmd_row['command']
-                        args = cmd_row['args'] or ""
-                        requested_by = cmd_row['requested_by']
-                        chat_id = cmd_row.get('chat_id')
-                        message_id = cmd_row.get('message_id')
-                        callback_data = cmd_row.get('callback_data')
-                        
-                        logger.info(f"Processing command queue ID {command_id}: {command} with args: {args}")
-                        
-                        # Mark as processing
-                        await conn.execute(
-                            "UPDATE command_queue SET status = 'processing' WHERE id = $1",
-                            command_id
-                        )
-                        
-                        # Execute command with enhanced handling
-                        result = await self.execute_queued_command(command, args, requested_by)
-                        
-                        # Clean up result for better display
-                        if result and len(result) > 3000:  # Truncate long results
-                            result = result[:2900] + "\n\n... (النتيجة مقطوعة للطول)"
-                        
-                        # Update with result
-                        await conn.execute(
-                            "UPDATE command_queue SET status = 'completed', result = $1, processed_at = CURRENT_TIMESTAMP WHERE id = $2",
-                            result or "تم تنفيذ الأمر بنجاح", command_id
-                        )
-                        
-                        logger.info(f"Successfully processed command {command_id}")
-                        
-                    except Exception as cmd_error:
-                        error_msg = str(cmd_error)
-                        logger.error(f"Failed to process command {command_id}: {error_msg}")
-                        
-                        try:
-                            # Mark as failed with error details
-                            await conn.execute(
-                                "UPDATE command_queue SET status = 'failed', result = $1, processed_at = CURRENT_TIMESTAMP WHERE id = $2",
-                                f"خطأ في التنفيذ: {error_msg}", command_id
-                            )
-                        except Exception as update_error:
-                            logger.error(f"Failed to update command {command_id} status: {update_error}")
+            if permissions.is_admin:
+                # Check specific admin permissions and collect missing critical ones
+                critical_missing = []
+                for attr, label, critical in _PERMISSION_FIELDS:
+                    granted = getattr(permissions, attr, False)
+                    lines.append(f"• {'✅' if granted else '❌'} {label}")
+                    if critical and not granted:
+                        critical_missing.append(label)
                 
+                if critical_missing:
+                    lines.append("\n⚠️ **صلاحيات مطلوبة مفقودة:**")
+                    lines.extend(f"• {missing}" for missing in critical_missing)
+                    lines.append("\n💡 **تنبيه:** البوت يحتاج صلاحية 'تعديل الرسائل' للعمل بشكل صحيح")
+                else:
+                    lines.append("\n✅ **جميع الصلاحيات المطلوبة متوفرة**")
+            
+            else:
+                lines.append("❌ البوت ليس مشرفاً - لا توجد صلاحيات إدارية")
+            
+            return "\n".join(lines)
+            
+        except Exception as e:
+            logger.error(f"Failed to format permissions text: {e}")
+            return f"❌ خطأ في عرض الصلاحيات: {e}"
+
+    async def process_command_queue(self) -> int:
+        """Process pending commands from control bot, returns how many were claimed"""
+        if self.db_pool is None:
+            return 0
+        
+        try:
+            # Claim pending commands atomically so concurrent processors never share a row
+            commands = await self.db_pool.fetch(_SQL_CLAIM_PENDING_COMMANDS)
         except Exception as e:
             logger.error(f"Failed to process command queue: {e}")
+            return 0
+        
+        # UPDATE ... RETURNING has no defined order; restore queue order so dependent
+        # commands (e.g. add a channel, then add an emoji to it) run in sequence
+        commands.sort(key=lambda cmd_row: (cmd_row['created_at'], cmd_row['id']))
+        
+        reads = []
+        for cmd_row in commands:
+            if cmd_row['command'] in _READ_ONLY_QUEUE_COMMANDS:
+                reads.append(cmd_row)
+                continue
+            # A state-changing command waits for the reads queued before it, and runs alone
+            if reads:
+                await self._run_queued_reads(reads)
+                reads = []
+            await self._run_queued_command(cmd_row)
+        if reads:
+            await self._run_queued_reads(reads)
+        return len(commands)
+
+    async def _run_queued_reads(self, commands):
+        """Run a run of consecutive read-only queued commands concurrently"""
+        results = await asyncio.gather(
+            *(self._run_queued_command(cmd_row) for cmd_row in commands),
+            return_exceptions=True
+        )
+        for cmd_row, result in zip(commands, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Queued command {cmd_row['id']} raised: {result!r}")
+
+    async def _run_queued_command(self, cmd_row):
+        """Execute one queued command and store its result"""
+        command_id = cmd_row['id']
+        async with self._cmd_sem:
+            try:
+                command = cmd_row['command']
+                args = cmd_row['args'] or ""
+                requested_by = cmd_row['requested_by']
+                
+                logger.info(f"Processing command queue ID {command_id}: {command} with args: {args}")
+                
+                # Execute command with enhanced handling
+                result = await self.execute_queued_command(command, args, requested_by)
+                
+                # Clean up result for better display
+                if result and len(result) > _RESULT_MAX_LENGTH:  # Truncate long results
+                    result = result[:_RESULT_TRUNCATE_AT] + _RESULT_TRUNCATED_SUFFIX
+                
+                # Update with result, empty results fall back to the default message in SQL
+                await self.db_pool.execute(_SQL_COMPLETE_COMMAND, result, command_id)
+                
+                logger.info(f"Successfully processed command {command_id}")
+                
+            except Exception as cmd_error:
+                error_msg = str(cmd_error)
+                logger.error(f"Failed to process command {command_id}: {error_msg}")
+                
+                try:
+                    # Mark as failed with error details
+                    await self.db_pool.execute(
+                        "UPDATE command_queue SET status = 'failed', result = $1, processed_at = CURRENT_TIMESTAMP WHERE id = $2",
+                        f"خطأ في التنفيذ: {error_msg}", command_id
+                    )
+                except Exception as update_error:
+                    logger.error(f"Failed to update command {command_id} status: {update_error}")
 
     async def execute_queued_command(self, command: str, args: str, requested_by: int) -> str:
         """Execute a queued command and return result with comprehensive command support"""
         try:
             logger.info(f"Executing command: {command} with args: {args}")
             
-            # Channel management commands
-            if command == 'list_channels':
-                return await self.get_channels_list()
-            elif command == 'add_channel':
-                return await self.handle_add_channel_command(args)
-            elif command == 'remove_channel':
-                return await self.handle_remove_channel_command(args)
-            elif command == 'check_channel_permissions':
-                return await self.handle_check_permissions_command(args)
-            
-            # Emoji management commands
-            elif command == 'list_global_emojis':
-                return await self.get_global_emojis_list()
-            elif command == 'list_channel_emojis':
-                if args:
-                    return await self.get_specific_channel_emojis_list(args)
-                return await self.get_channel_emojis_list()
-            elif command == 'add_emoji_replacement':
-                return await self.handle_add_emoji_command(args)
-            elif command == 'delete_emoji_replacement':
-                return await self.handle_delete_emoji_command(args)
-            elif command == 'clean_duplicates':
-                return await self.handle_clean_duplicates_command()
-            
-            # Channel-specific emoji commands
-            elif command == 'add_channel_emoji_replacement':
-                return await self.handle_add_channel_emoji_command(args)
-            elif command == 'list_channel_emoji_replacements':
-                return await self.handle_list_channel_emoji_command(args)
-            elif command == 'activate_channel_replacement':
-                return await self.handle_activate_channel_replacement_command(args)
-            elif command == 'deactivate_channel_replacement':
-                return await self.handle_deactivate_channel_replacement_command(args)
-            
-            # Forwarding task commands
-            elif command == 'list_forwarding_tasks':
-                return await self.get_forwarding_tasks_list()
-            elif command == 'add_forwarding_task':
-                return await self.handle_add_forwarding_task_command(args)
-            elif command == 'delete_forwarding_task':
-                return await self.handle_delete_forwarding_task_command(args)
-            elif command == 'activate_forwarding_task':
-                return await self.handle_activate_forwarding_task_command(args)
-            elif command == 'deactivate_forwarding_task':
-                return await self.handle_deactivate_forwarding_task_command(args)
-            elif command == 'update_forwarding_delay':
-                return await self.handle_update_forwarding_delay_command(args)
-            
-            # Admin management commands
-            elif command == 'list_admins':
-                return await self.get_admins_list()
-            elif command == 'add_admin':
-                return await self.handle_add_admin_command(args)
-            elif command == 'remove_admin':
-                return await self.handle_remove_admin_command(args)
-            
-            # System commands
-            elif command == 'get_stats':
-                return await self.get_system_stats()
-            elif command == 'test_connection':
-                return await self.test_system_connection()
-            elif command == 'sync_data':
-                return await self.sync_system_data()
-            elif command == 'detailed_report':
-                return await self.get_detailed_system_report()
-            
-            else:
+            entry = self._queue_handlers.get(command)
+            if entry is None:
                 return f"❌ أمر غير معروف: {command}"
+            
+            handler, takes_args = entry
+            return await (handler(args) if takes_args else handler())
                 
         except Exception as e:
             logger.error(f"Failed to execute command {command}: {e}")
@@ -1011,69 +1478,81 @@ class TelegramEmojiBot:
         if not self.monitored_channels:
             return "لا توجد قنوات مراقبة محفوظة"
         
-        result = "📺 **قائمة القنوات المراقبة:**\n\n"
+        status_map = self.channel_replacement_status
+        channel_mappings = self.channel_emoji_mappings
+        
+        parts = ["📺 **قائمة القنوات المراقبة:**\n\n"]
         for channel_id, info in self.monitored_channels.items():
             title = info['title'] or 'غير معروف'
             username = info['username'] or 'غير متاح'
             
             # Get replacement status
-            is_active = self.channel_replacement_status.get(channel_id, True)
-            status_icon = "✅" if is_active else "❌"
-            status_text = "مُفعل" if is_active else "مُعطل"
+            status_label = _REPLACEMENT_STATUS_LABEL[bool(status_map.get(channel_id, True))]
             
             # Count replacements
-            replacement_count = len(self.channel_emoji_mappings.get(channel_id, {}))
-            
-            result += f"• **{title}** (@{username})\n"
-            result += f"  📋 المعرف: `{channel_id}`\n"
-            result += f"  🔄 الاستبدال: {status_icon} {status_text}\n"
-            result += f"  📝 الاستبدالات: {replacement_count}\n\n"
+            mappings = channel_mappings.get(channel_id)
+            replacement_count = len(mappings) if mappings else 0
+            
+            parts.append(
+                f"• **{title}** (@{username})\n"
+                f"  📋 المعرف: `{channel_id}`\n"
+                f"  🔄 الاستبدال: {status_label}\n"
+                f"  📝 الاستبدالات: {replacement_count}\n\n"
+            )
         
-        return result
+        return "".join(parts)
 
     async def get_global_emojis_list(self) -> str:
         """Get formatted list of global emoji replacements"""
         if not self.emoji_mappings:
             return "لا توجد استبدالات إيموجي عامة محفوظة"
         
-        result = "😀 **قائمة الاستبدالات العامة:**\n\n"
-        count = 0
-        for normal_emoji, premium_id in self.emoji_mappings.items():
-            result += f"• {normal_emoji} → `{premium_id}`\n"
-            count += 1
-            if count >= 20:  # Limit to prevent very long messages
-                result += f"\n... وعدد {len(self.emoji_mappings) - 20} استبدال آخر"
-                break
+        parts = ["😀 **قائمة الاستبدالات العامة:**\n\n"]
+        # Limit to prevent very long messages
+        parts.extend(
+            f"• {normal_emoji} → `{premium_id}`\n"
+            for normal_emoji, premium_id in islice(self.emoji_mappings.items(), 20)
+        )
+        remaining = len(self.emoji_mappings) - 20
+        if remaining > 0:
+            parts.append(f"\n... وعدد {remaining} استبدال آخر")
         
-        return result
+        return "".join(parts)
 
     async def get_channel_emojis_list(self) -> str:
         """Get formatted list of channel-specific emoji replacements"""
         if not self.channel_emoji_mappings:
             return "لا توجد استبدالات إيموجي خاصة بالقنوات"
         
-        result = "🎯 **استبدالات القنوات:**\n\n"
+        parts = ["🎯 **استبدالات القنوات:**\n\n"]
         for channel_id, mappings in self.channel_emoji_mappings.items():
             channel_name = self.monitored_channels.get(channel_id, {}).get('title', f'القناة {channel_id}')
-            result += f"📺 **{channel_name}** (`{channel_id}`):\n"
-            
-            count = 0
-            for normal_emoji, premium_id in mappings.items():
-                result += f"  • {normal_emoji} → `{premium_id}`\n"
-                count += 1
-                if count >= 10:  # Limit per channel
-                    result += f"  ... وعدد {len(mappings) - 10} استبدال آخر\n"
-                    break
-            result += "\n"
+            parts.append(f"📺 **{channel_name}** (`{channel_id}`):\n")
+            
+            # Limit per channel
+            parts.extend(
+                f"  • {normal_emoji} → `{premium_id}`\n"
+                for normal_emoji, premium_id in islice(mappings.items(), 10)
+            )
+            remaining = len(mappings) - 10
+            if remaining > 0:
+                parts.append(f"  ... وعدد {remaining} استبدال آخر\n")
+            parts.append("\n")
         
-        return result
+        return "".join(parts)
+
+    async def handle_list_channel_emojis_command(self, args: str) -> str:
+        """List replacements for one channel if given, otherwise for all channels"""
+        if args:
+            return await self.get_specific_channel_emojis_list(args)
+        return await self.get_channel_emojis_list()
 
     async def get_forwarding_tasks_list(self) -> str:
         """Get formatted list of forwarding tasks"""
         if not self.forwarding_tasks:
             return "لا توجد مهام نسخ محفوظة"
         
-        result = "🔄 **قائمة مهام النسخ:**\n\n"
+        parts = ["🔄 **قائمة مهام النسخ:**\n\n"]
         for task_id, task_info in self.forwarding_tasks.items():
             source_id = task_info['source']
             target_id = task_info['target']
@@ -1087,31 +1566,37 @@ class TelegramEmojiBot:
             status_icon = "✅" if is_active else "❌"
             status_text = "مُفعلة" if is_active else "مُعطلة"
 
-            result += f"🆔 **المهمة:** `{task_id}`\n"
-            result += f"📤 **من:** {source_name}\n"
-            result += f"📥 **إلى:** {target_name}\n"
-            result += f"🔄 **الحالة:** {status_icon} {status_text}\n"
-            result += f"⏱️ **التأخير:** {delay} ثانية\n"
+            parts.append(
+                f"🆔 **المهمة:** `{task_id}`\n"
+                f"📤 **من:** {source_name}\n"
+                f"📥 **إلى:** {target_name}\n"
+                f"🔄 **الحالة:** {status_icon} {status_text}\n"
+                f"⏱️ **التأخير:** {delay} ثانية\n"
+            )
             
             if description:
-                result += f"📝 **الوصف:** {description}\n"
+                parts.append(f"📝 **الوصف:** {description}\n")
             
-            result += "\n"
+            parts.append("\n")
 
-        return result
+        return "".join(parts)
 
     async def get_system_stats(self) -> str:
         """Get system statistics"""
+        global_count = len(self.emoji_mappings)
+        channel_specific_count = self._channel_mapping_total
+        active_channels = self._active_replacement_count
+        
         stats = f"""📊 **إحصائيات النظام:**
 
 📺 **القنوات:**
 • المراقبة: {len(self.monitored_channels)}
-• الاستبدال المفعل: {sum(1 for active in self.channel_replacement_status.values() if active)}
+• الاستبدال المفعل: {active_channels}
 
 😀 **الاستبدالات:**
-• العامة: {len(self.emoji_mappings)}
-• الخاصة بالقنوات: {sum(len(mappings) for mappings in self.channel_emoji_mappings.values())}
-• الإجمالي: {len(self.emoji_mappings) + sum(len(mappings) for mappings in self.channel_emoji_mappings.values())}
+• العامة: {global_count}
+• الخاصة بالقنوات: {channel_specific_count}
+• الإجمالي: {global_count + channel_specific_count}
 
 🔄 **مهام النسخ:**
 • النشطة: {len(self.forwarding_tasks)}
@@ -1130,36 +1615,127 @@ class TelegramEmojiBot:
         except Exception as e:
             logger.error(f"Failed to send result to user {user_id}: {e}")
 
+    def _on_command_notify(self, connection, pid, channel, payload):
+        """Wake the command queue processor when a new command is queued"""
+        self._command_queue_event.set()
+
+    def _on_listen_terminated(self, connection):
+        """Wake the command queue processor so it can re-subscribe on a fresh connection"""
+        self._command_queue_event.set()
+
+    async def _listen_for_commands(self) -> bool:
+        """Subscribe to command queue notifications, returns False if unavailable"""
+        if self.db_pool is None:
+            return False
+        try:
+            self._listen_conn = await self.db_pool.acquire()
+            await self._listen_conn.execute(_SQL_COMMAND_QUEUE_NOTIFY_TRIGGER)
+            await self._listen_conn.add_listener(_COMMAND_QUEUE_CHANNEL, self._on_command_notify)
+            self._listen_conn.add_termination_listener(self._on_listen_terminated)
+            logger.info("Listening for command queue notifications")
+            return True
+        except Exception as e:
+            logger.warning(f"Command queue notifications unavailable, falling back to polling: {e}")
+            if self._listen_conn is not None:
+                await self.db_pool.release(self._listen_conn)
+                self._listen_conn = None
+            return False
+
+    async def _db_writer(self):
+        """Run submitted database writes one at a time, in order"""
+        try:
+            while True:
+                write, future = await self._write_queue.get()
+                try:
+                    result = await write()
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                except BaseException:
+                    if not future.done():
+                        future.cancel()
+                    raise
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._fail_pending_writes()
+
+    def _fail_pending_writes(self):
+        """Fail every queued write so no submit_write caller waits forever"""
+        while not self._write_queue.empty():
+            _, future = self._write_queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Database writer stopped"))
+
+    async def submit_write(self, write: Callable[[], Awaitable]):
+        """Queue a database write for the single writer and wait for its result"""
+        if self._writer_task is None or self._writer_task.done():
+            return await write()
+        future = asyncio.get_running_loop().create_future()
+        # A writer that is still shutting down drains this in its finally block
+        self._write_queue.put_nowait((write, future))
+        return await future
+
     async def start_command_queue_processor(self):
-        """Start periodic command queue processing"""
+        """Process queued commands on notification, with a periodic safety poll"""
+        loop = asyncio.get_running_loop()
+        listening = await self._listen_for_commands()
+        listen_retry_delay = 5
+        next_listen_retry = loop.time() + listen_retry_delay
         while True:
+            if self._listen_conn is not None and self._listen_conn.is_closed():
+                # The listener connection dropped; hand it back to the pool and subscribe again
+                logger.warning("Command queue listener connection lost, re-subscribing")
+                try:
+                    await self.db_pool.release(self._listen_conn)
+                except Exception as e:
+                    logger.error(f"Failed to release command queue listener: {e}")
+                self._listen_conn = None
+                listening = False
+                listen_retry_delay = 5
+                next_listen_retry = loop.time()
+            if not listening and loop.time() >= next_listen_retry:
+                # A drop usually means a database restart, so keep retrying with a backoff
+                listening = await self._listen_for_commands()
+                if listening:
+                    listen_retry_delay = 5
+                else:
+                    next_listen_retry = loop.time() + listen_retry_delay
+                    listen_retry_delay = min(listen_retry_delay * 2, 300)
+            # With notifications the poll only recovers commands missed while disconnected
+            poll_interval = 60 if listening else 5
+            self._command_queue_event.clear()
             try:
-                await self.process_command_queue()
-                await asyncio.sleep(5)  # Check every 5 seconds
+                claimed = await self.process_command_queue()
             except Exception as e:
                 logger.error(f"Command queue processor error: {e}")
                 await asyncio.sleep(10)  # Wait longer on error
+                continue
+            if claimed >= _COMMAND_CLAIM_BATCH:
+                # A full batch means more may be pending; their notifications may already be consumed
+                continue
+            try:
+                await asyncio.wait_for(self._command_queue_event.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
 
-    async def add_admin(self, user_id: int, username: str = None, added_by: int = None) -> bool:
-        """Add admin to database and cache"""
+    async def add_admin(self, user_id: int, username: str = None, added_by: int = None) -> Optional[bool]:
+        """Add admin to database and cache; None means the user was already an active admin"""
         if self.db_pool is None:
             logger.error("Database pool not initialized")
             return False
         try:
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    """INSERT INTO bot_admins (user_id, username, added_by, is_active) 
-                       VALUES ($1, $2, $3, TRUE) 
-                       ON CONFLICT (user_id) 
-                       DO UPDATE SET username = $2, added_by = $3, is_active = TRUE""",
-                    user_id, username, added_by
-                )
-                
-                # Update cache
-                self.admin_ids.add(user_id)
-                logger.info(f"Added admin: {user_id}")
-                return True
-                
+            added = await self.db_pool.fetchval(_SQL_UPSERT_ADMIN, user_id, username, added_by)
+            
+            # Update cache either way so it catches up with the database
+            self.admin_ids.add(user_id)
+            self._refresh_authorized_ids()
+            if added is None:
+                return None
+            logger.info(f"Added admin: {user_id}")
+            return True
+            
         except Exception as e:
             logger.error(f"Failed to add admin: {e}")
             return False
@@ -1171,19 +1747,17 @@ class TelegramEmojiBot:
             return False
             
         # Prevent removing the default admin
-        if user_id == 6602517122:
+        if user_id == _DEFAULT_ADMIN_ID:
             return False
             
         try:
             async with self.db_pool.acquire() as conn:
-                result = await conn.execute(
-                    "UPDATE bot_admins SET is_active = FALSE WHERE user_id = $1",
-                    user_id
-                )
+                result = await conn.execute(_SQL_DEACTIVATE_ADMIN, user_id)
                 
                 if result == 'UPDATE 1':
                     # Update cache
                     self.admin_ids.discard(user_id)
+                    self._refresh_authorized_ids()
                     logger.info(f"Removed admin: {user_id}")
                     return True
                 else:
@@ -1200,16 +1774,12 @@ class TelegramEmojiBot:
             return False
         try:
             async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    """INSERT INTO emoji_replacements (normal_emoji, premium_emoji_id, description) 
-                       VALUES ($1, $2, $3) 
-                       ON CONFLICT (normal_emoji) 
-                       DO UPDATE SET premium_emoji_id = $2, description = $3""",
-                    normal_emoji, premium_emoji_id, description
-                )
+                await conn.execute(_SQL_UPSERT_EMOJI_REPLACEMENT, normal_emoji, premium_emoji_id, description)
                 
                 # Update cache
                 self.emoji_mappings[normal_emoji] = premium_emoji_id
+                self._invalidate_merged_mappings()
+                self._list_cache = None
                 logger.info(f"Added/updated emoji replacement: {normal_emoji} -> {premium_emoji_id}")
                 return True
                 
@@ -1217,6 +1787,29 @@ class TelegramEmojiBot:
             logger.error(f"Failed to add emoji replacement: {e}")
             return False
 
+    async def add_emoji_replacements_bulk(self, items: List[Tuple[str, int, Optional[str]]]) -> int:
+        """Add or update many emoji replacements in one transaction, returns rows written"""
+        if self.db_pool is None:
+            logger.error("Database pool not initialized")
+            return 0
+        if not items:
+            return 0
+        try:
+            async with self.db_pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(_SQL_UPSERT_EMOJI_REPLACEMENT, items)
+            
+            # Update cache
+            self.emoji_mappings.update((normal_emoji, premium_emoji_id) for normal_emoji, premium_emoji_id, _ in items)
+            self._invalidate_merged_mappings()
+            self._list_cache = None
+            logger.info(f"Added/updated {len(items)} emoji replacements")
+            return len(items)
+            
+        except Exception as e:
+            logger.error(f"Failed to add emoji replacements: {e}")
+            return 0
+
     async def delete_emoji_replacement(self, normal_emoji: str) -> bool:
         """Delete emoji replacement from database and cache"""
         if self.db_pool is None:
@@ -1224,14 +1817,13 @@ class TelegramEmojiBot:
             return False
         try:
             async with self.db_pool.acquire() as conn:
-                result = await conn.execute(
-                    "DELETE FROM emoji_replacements WHERE normal_emoji = $1",
-                    normal_emoji
-                )
+                result = await conn.execute(_SQL_DELETE_EMOJI_REPLACEMENT, normal_emoji)
                 
                 if result == 'DELETE 1':
                     # Update cache
                     self.emoji_mappings.pop(normal_emoji, None)
+                    self._invalidate_merged_mappings()
+                    self._list_cache = None
                     logger.info(f"Deleted emoji replacement: {normal_emoji}")
                     return True
                 else:
@@ -1247,17 +1839,17 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return 0
         try:
-            async with self.db_pool.acquire() as conn:
-                # Get count before deletion
-                count_result = await conn.fetchval("SELECT COUNT(*) FROM emoji_replacements")
-                
-                # Delete all replacements
-                await conn.execute("DELETE FROM emoji_replacements")
-                
-                # Clear cache
-                self.emoji_mappings.clear()
-                logger.info(f"Deleted all {count_result} emoji replacements")
-                return count_result
+            # Delete all replacements and count them in one atomic statement
+            count_result = await self.db_pool.fetchval(
+                "WITH deleted AS (DELETE FROM emoji_replacements RETURNING 1) SELECT COUNT(*) FROM deleted"
+            )
+            
+            # Clear cache
+            self.emoji_mappings.clear()
+            self._invalidate_merged_mappings()
+            self._list_cache = None
+            logger.info(f"Deleted all {count_result} emoji replacements")
+            return count_result
                 
         except Exception as e:
             logger.error(f"Failed to delete all emoji replacements: {e}")
@@ -1265,29 +1857,40 @@ class TelegramEmojiBot:
 
     async def add_channel_emoji_replacement(self, channel_id: int, normal_emoji: str, premium_emoji_id: int, description: Optional[str] = None) -> bool:
         """Add or update channel-specific emoji replacement in database and cache"""
+        return await self.add_channel_emoji_replacements_bulk(
+            channel_id, [(normal_emoji, premium_emoji_id, description)]
+        ) == 1
+
+    async def add_channel_emoji_replacements_bulk(self, channel_id: int, items: List[Tuple[str, int, Optional[str]]]) -> int:
+        """Add or update many channel-specific emoji replacements in one transaction, returns rows written"""
         if self.db_pool is None:
             logger.error("Database pool not initialized")
-            return False
+            return 0
+        if not items:
+            return 0
         try:
             async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    """INSERT INTO channel_emoji_replacements (channel_id, normal_emoji, premium_emoji_id, description) 
-                       VALUES ($1, $2, $3, $4) 
-                       ON CONFLICT (channel_id, normal_emoji) 
-                       DO UPDATE SET premium_emoji_id = $3, description = $4""",
-                    channel_id, normal_emoji, premium_emoji_id, description
-                )
-                
-                # Update cache
-                if channel_id not in self.channel_emoji_mappings:
-                    self.channel_emoji_mappings[channel_id] = {}
-                self.channel_emoji_mappings[channel_id][normal_emoji] = premium_emoji_id
-                logger.info(f"Added/updated channel {channel_id} emoji replacement: {normal_emoji} -> {premium_emoji_id}")
-                return True
-                
+                async with conn.transaction():
+                    await conn.executemany(
+                        _SQL_UPSERT_CHANNEL_EMOJI_REPLACEMENT,
+                        [(channel_id, normal_emoji, premium_emoji_id, description)
+                         for normal_emoji, premium_emoji_id, description in items]
+                    )
+            
+            # Update cache
+            channel_mappings = self.channel_emoji_mappings.setdefault(channel_id, {})
+            previous_count = len(channel_mappings)
+            channel_mappings.update(
+                (normal_emoji, premium_emoji_id) for normal_emoji, premium_emoji_id, _ in items
+            )
+            self._channel_mapping_total += len(channel_mappings) - previous_count
+            self._invalidate_merged_mappings(channel_id)
+            logger.info(f"Added/updated {len(items)} emoji replacements for channel {channel_id}")
+            return len(items)
+            
         except Exception as e:
-            logger.error(f"Failed to add channel emoji replacement: {e}")
-            return False
+            logger.error(f"Failed to add channel emoji replacements: {e}")
+            return 0
 
     async def delete_channel_emoji_replacement(self, channel_id: int, normal_emoji: str) -> bool:
         """Delete channel-specific emoji replacement from database and cache"""
@@ -1303,10 +1906,12 @@ class TelegramEmojiBot:
                 
                 if result == 'DELETE 1':
                     # Update cache
-                    if channel_id in self.channel_emoji_mappings:
-                        self.channel_emoji_mappings[channel_id].pop(normal_emoji, None)
-                        if not self.channel_emoji_mappings[channel_id]:
+                    channel_mappings = self.channel_emoji_mappings.get(channel_id)
+                    if channel_mappings is not None and channel_mappings.pop(normal_emoji, None) is not None:
+                        self._channel_mapping_total -= 1
+                        if not channel_mappings:
                             del self.channel_emoji_mappings[channel_id]
+                    self._invalidate_merged_mappings(channel_id)
                     logger.info(f"Deleted channel {channel_id} emoji replacement: {normal_emoji}")
                     return True
                 else:
@@ -1322,25 +1927,20 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return 0
         try:
-            async with self.db_pool.acquire() as conn:
-                # Get count before deletion
-                count_result = await conn.fetchval(
-                    "SELECT COUNT(*) FROM channel_emoji_replacements WHERE channel_id = $1",
-                    channel_id
-                )
-                
-                # Delete all replacements for this channel
-                await conn.execute(
-                    "DELETE FROM channel_emoji_replacements WHERE channel_id = $1",
-                    channel_id
-                )
+            # Delete all replacements for this channel and count them in one atomic statement
+            count_result = await self.db_pool.fetchval(
+                """WITH deleted AS (
+                       DELETE FROM channel_emoji_replacements WHERE channel_id = $1 RETURNING 1
+                   ) SELECT COUNT(*) FROM deleted""",
+                channel_id
+            )
+            
+            # Clear cache for this channel
+            self._channel_mapping_total -= len(self.channel_emoji_mappings.pop(channel_id, ()))
+            self._invalidate_merged_mappings(channel_id)
                 
-                # Clear cache for this channel
-                if channel_id in self.channel_emoji_mappings:
-                    del self.channel_emoji_mappings[channel_id]
-                    
-                logger.info(f"Deleted all {count_result} emoji replacements for channel {channel_id}")
-                return count_result
+            logger.info(f"Deleted all {count_result} emoji replacements for channel {channel_id}")
+            return count_result
                 
         except Exception as e:
             logger.error(f"Failed to delete all channel emoji replacements: {e}")
@@ -1370,9 +1970,11 @@ class TelegramEmojiBot:
                     'username': channel_username or '',
                     'title': channel_title or ''
                 }
+                self._reindex_monitored_channels()
+                self._invalidate_entity_cache(channel_id, channel_username)
                 # Set default replacement status to active for new channels
                 if channel_id not in self.channel_replacement_status:
-                    self.channel_replacement_status[channel_id] = True
+                    self._set_replacement_status(channel_id, True)
                     
                 logger.info(f"Added/updated monitored channel: {channel_id}")
                 return True
@@ -1387,250 +1989,99 @@ class TelegramEmojiBot:
             logger.error("Database pool not initialized")
             return False
         try:
-            async with self.db_pool.acquire() as conn:
-                # First, delete all channel-specific emoji replacements
-                emoji_delete_result = await conn.execute(
-                    "DELETE FROM channel_emoji_replacements WHERE channel_id = $1",
-                    channel_id
-                )
-                
-                # Extract count from delete result (format: 'DELETE n')
-                emoji_deleted_count = 0
-                if emoji_delete_result and emoji_delete_result.startswith('DELETE '):
-                    try:
-                        emoji_deleted_count = int(emoji_delete_result.split(' ')[1])
-                    except (IndexError, ValueError):
-                        emoji_deleted_count = 0
-                
-                # Then remove the channel from monitoring
-                result = await conn.execute(
-                    "UPDATE monitored_channels SET is_active = FALSE WHERE channel_id = $1",
-                    channel_id
-                )
+            # Delete the channel's emoji replacements and deactivate it in one atomic statement;
+            # no row comes back when the channel is not monitored
+            emoji_deleted_count = await self.db_pool.fetchval(
+                """WITH deleted AS (
+                       DELETE FROM channel_emoji_replacements WHERE channel_id = $1 RETURNING 1
+                   )
+                   UPDATE monitored_channels SET is_active = FALSE WHERE channel_id = $1
+                   RETURNING (SELECT COUNT(*) FROM deleted)""",
+                channel_id
+            )
+            
+            if emoji_deleted_count is None:
+                return False
+            
+            # Update cache - remove channel
+            channel_info = self.monitored_channels.pop(channel_id, None) or {}
+            self._reindex_monitored_channels()
+            self._invalidate_entity_cache(channel_id, channel_info.get('username'))
+            
+            # Update cache - remove channel emoji mappings
+            self._channel_mapping_total -= len(self.channel_emoji_mappings.pop(channel_id, ()))
+            self._invalidate_merged_mappings(channel_id)
+            
+            logger.info(f"Removed monitored channel: {channel_id}")
+            if emoji_deleted_count > 0:
+                logger.info(f"Also deleted {emoji_deleted_count} channel-specific emoji replacements")
+            
+            return True
                 
-                if result == 'UPDATE 1':
-                    # Update cache - remove channel
-                    self.monitored_channels.pop(channel_id, None)
-                    
-                    # Update cache - remove channel emoji mappings
-                    if channel_id in self.channel_emoji_mappings:
-                        del self.channel_emoji_mappings[channel_id]
-                    
-                    logger.info(f"Removed monitored channel: {channel_id}")
-                    if emoji_deleted_count > 0:
-                        logger.info(f"Also deleted {emoji_deleted_count} channel-specific emoji replacements")
-                    
-                    return True
-                else:
-                    return False
-                    
         except Exception as e:
             logger.error(f"Failed to remove monitored channel: {e}")
             return False
 
+    async def _edit_message(self, chat_id: int, message_id: int, text: str, entities: list):
+        """Edit a message with raw entities, bounded by the shared edit semaphore"""
+        async with self._edit_sem:
+            await self.client.edit_message(
+                chat_id,
+                message_id,
+                text,
+                formatting_entities=entities,
+                parse_mode=None  # Use raw entities to preserve everything
+            )
+
     def extract_emojis_from_text(self, text: str) -> List[str]:
         """Extract all unique emojis and symbols from text using regex - handles composite emojis, variation selectors, and special symbols"""
         
-        # Debug: Print Unicode codepoints for each character
-        logger.info(f"Text analysis for: '{text}'")
-        for i, char in enumerate(text):
-            unicode_point = ord(char)
-            logger.info(f"  Char {i}: '{char}' -> U+{unicode_point:04X}")
+        # Every emoji and fallback symbol lies outside ASCII
+        if text.isascii():
+            return []
         
-        # Enhanced regex pattern to match composite emojis and common symbols
-        emoji_pattern = re.compile(
-            r"("
-            # Standard emoji ranges
-            r"[\U0001F600-\U0001F64F"  # emoticons
-            r"\U0001F300-\U0001F5FF"   # symbols & pictographs
-            r"\U0001F680-\U0001F6FF"   # transport & map
-            r"\U0001F1E0-\U0001F1FF"   # flags (iOS)
-            r"\U00002700-\U000027BF"   # dingbats
-            r"\U0001F900-\U0001F9FF"   # supplemental symbols
-            r"\U00002600-\U000026FF"   # miscellaneous symbols
-            r"\U0001F170-\U0001F251"   # enclosed characters
-            r"\U0001F7E0-\U0001F7FF"   # geometric shapes extended
-            r"\U00002190-\U000021FF"   # arrows
-            r"\U00002100-\U0000214F"   # letterlike symbols
-            r"\U00002150-\U0000218F"   # number forms
-            r"\U00002460-\U000024FF"   # enclosed alphanumerics
-            r"\U000025A0-\U000025FF"   # geometric shapes
-            r"\U00002B00-\U00002BFF"   # miscellaneous symbols and arrows
-            r"\U0001F004"              # mahjong tile red dragon
-            r"\U0001F0CF"              # playing card black joker
-            r"\U0001F18E"              # negative squared ab
-            r"\U0001F191-\U0001F19A"   # squared symbols
-            r"\U0001F1E6-\U0001F1FF"   # regional indicator symbols
-            r"\U0001F201-\U0001F202"   # squared symbols
-            r"\U0001F21A"              # squared cjk unified ideograph-7121
-            r"\U0001F22F"              # squared cjk unified ideograph-6307
-            r"\U0001F232-\U0001F23A"   # squared symbols
-            r"\U0001F250-\U0001F251"   # circled symbols
-            # Common punctuation and symbols that users might want to replace
-            r"\U00002022"              # bullet point •
-            r"\U00002023"              # triangular bullet ‣
-            r"\U00002043"              # hyphen bullet ⁃
-            r"\U0000204C"              # black leftwards bullet ⁌
-            r"\U0000204D"              # black rightwards bullet ⁍
-            r"\U000025E6"              # white bullet ◦
-            r"\U00002219"              # bullet operator ∙
-            r"\U000000B7"              # middle dot ·
-            r"\U000025AA"              # black small square ▪
-            r"\U000025AB"              # white small square ▫
-            r"\U000025B6"              # black right-pointing triangle ▶
-            r"\U000025C0"              # black left-pointing triangle ◀
-            r"\U000025CF"              # black circle ●
-            r"\U000025CB"              # white circle ○
-            r"\U000025A0"              # black square ■
-            r"\U000025A1"              # white square □
-            r"\U00002713"              # check mark ✓
-            r"\U00002714"              # heavy check mark ✔
-            r"\U00002717"              # ballot x ✗
-            r"\U00002718"              # heavy ballot x ✘
-            r"\U0000274C"              # cross mark ❌
-            r"\U00002705"              # white heavy check mark ✅
-            r"\U0000274E"              # negative squared cross mark ❎
-            r"\U000027A1"              # black rightwards arrow ➡
-            r"\U00002B05"              # leftwards black arrow ⬅
-            r"\U00002B06"              # upwards black arrow ⬆
-            r"\U00002B07"              # downwards black arrow ⬇
-            r"\U000021A9"              # leftwards arrow with hook ↩
-            r"\U000021AA"              # rightwards arrow with hook ↪
-            r"]"
-            r"[\U0000FE00-\U0000FE0F]?"  # optional variation selectors
-            r"(?:\U0000200D"             # zero-width joiner (for compound emojis)
-            r"[\U0001F600-\U0001F64F"
-            r"\U0001F300-\U0001F5FF"
-            r"\U0001F680-\U0001F6FF"
-            r"\U0001F1E0-\U0001F1FF"
-            r"\U00002700-\U000027BF"
-            r"\U0001F900-\U0001F9FF"
-            r"\U00002600-\U000026FF"
-            r"\U0001F170-\U0001F251"
-            r"\U0001F7E0-\U0001F7FF"
-            r"\U00002190-\U000021FF"
-            r"\U00002100-\U0000214F"
-            r"\U00002150-\U0000218F"
-            r"\U00002460-\U000024FF"
-            r"\U000025A0-\U000025FF"
-            r"\U00002B00-\U00002BFF"
-            r"\U0001F004"
-            r"\U0001F0CF"
-            r"\U0001F18E"
-            r"\U0001F191-\U0001F19A"
-            r"\U0001F1E6-\U0001F1FF"
-            r"\U0001F201-\U0001F202"
-            r"\U0001F21A"
-            r"\U0001F22F"
-            r"\U0001F232-\U0001F23A"
-            r"\U0001F250-\U0001F251"
-            r"\U00002022"
-            r"\U00002023"
-            r"\U00002043"
-            r"\U0000204C"
-            r"\U0000204D"
-            r"\U000025E6"
-            r"\U00002219"
-            r"\U000000B7"
-            r"\U000025AA"
-            r"\U000025AB"
-            r"\U000025B6"
-            r"\U000025C0"
-            r"\U000025CF"
-            r"\U000025CB"
-            r"\U000025A0"
-            r"\U000025A1"
-            r"\U00002713"
-            r"\U00002714"
-            r"\U00002717"
-            r"\U00002718"
-            r"\U0000274C"
-            r"\U00002705"
-            r"\U0000274E"
-            r"\U000027A1"
-            r"\U00002B05"
-            r"\U00002B06"
-            r"\U00002B07"
-            r"\U000021A9"
-            r"\U000021AA"
-            r"][\U0000FE00-\U0000FE0F]?)?"  # optional second emoji component with variation selector
-            r")",
-            flags=re.UNICODE
-        )
-        
-        # Get all emojis and symbols found in text
-        found_emojis = emoji_pattern.findall(text)
-        logger.info(f"Regex found emojis/symbols: {found_emojis}")
-        
-        # Fallback: Check each character individually for common symbols that might be missed
-        fallback_symbols = {
-            '•': '\U00002022',  # bullet point
-            '◦': '\U000025E6',  # white bullet
-            '▪': '\U000025AA',  # black small square
-            '▫': '\U000025AB',  # white small square
-            '●': '\U000025CF',  # black circle
-            '○': '\U000025CB',  # white circle
-            '■': '\U000025A0',  # black square
-            '□': '\U000025A1',  # white square
-            '✓': '\U00002713',  # check mark
-            '✔': '\U00002714',  # heavy check mark
-            '✗': '\U00002717',  # ballot x
-            '✘': '\U00002718',  # heavy ballot x
-            '❌': '\U0000274C', # cross mark
-            '✅': '\U00002705', # white heavy check mark
-            '❎': '\U0000274E', # negative squared cross mark
-            '➡': '\U000027A1',  # black rightwards arrow
-            '⬅': '\U00002B05',  # leftwards black arrow
-            '⬆': '\U00002B06',  # upwards black arrow
-            '⬇': '\U00002B07',  # downwards black arrow
-            '↩': '\U000021A9',  # leftwards arrow with hook
-            '↪': '\U000021AA',  # rightwards arrow with hook
-            '·': '\U000000B7',  # middle dot
-            '∙': '\U00002219',  # bullet operator
-        }
+        # Get all emojis and symbols found in text, unique while preserving order
+        found_emojis = dict.fromkeys(_EMOJI_PATTERN.findall(text))
         
-        # Check for symbols that might have been missed by the regex
-        for char in text:
-            if char in fallback_symbols and char not in found_emojis:
-                found_emojis.append(char)
-                logger.info(f"Fallback found symbol: {char} (U+{ord(char):04X})")
-        
-        # Return unique emojis while preserving order
-        unique_emojis = []
-        seen = set()
-        for emoji in found_emojis:
-            if emoji and emoji not in seen:
-                unique_emojis.append(emoji)
-                seen.add(emoji)
+        # Add bare symbols the regex only matched as part of a longer sequence
+        missed = set(_FALLBACK_SYMBOLS.intersection(text))
+        missed.difference_update(found_emojis)
+        if missed:
+            # Walk the text only to keep the symbols in order of appearance
+            for char in text:
+                if char in missed:
+                    missed.discard(char)
+                    found_emojis[char] = None
+                    logger.debug("Fallback found symbol: %s (U+%04X)", char, ord(char))
+                    if not missed:
+                        break
         
-        logger.info(f"Final unique emojis/symbols: {unique_emojis}")
+        unique_emojis = list(found_emojis)
+        logger.debug("Final unique emojis/symbols: %s", unique_emojis)
         return unique_emojis
 
     async def replace_emojis_in_message(self, event):
         """Replace normal emojis with premium emojis in a message"""
         try:
             message = event.message
-            original_text = message.text or message.message
+            # Raw text: entity offsets refer to it, not to the markdown-rendered message.text
+            original_text = message.message
             
-            logger.info(f"Attempting to replace emojis in message: '{original_text}'")
+            logger.debug("Attempting to replace emojis in message: '%s'", original_text)
             
             if not original_text:
-                logger.info("No text in message, skipping emoji replacement")
+                logger.debug("No text in message, skipping emoji replacement")
+                return
+            
+            # Every replaceable emoji lies outside ASCII
+            if original_text.isascii():
                 return
             
             # Skip if message already contains premium emoji markdown format or custom emoji entities
             # This prevents re-processing already processed messages
             if ("[💎](emoji/" in original_text or 
-                (message.entities and any(hasattr(entity, 'document_id') for entity in message.entities))):
-                logger.info("Message already contains premium emojis or custom emoji entities, skipping replacement")
-                return
-            
-            # Extract emojis from the message
-            found_emojis = self.extract_emojis_from_text(original_text)
-            logger.info(f"Found emojis in text: {found_emojis}")
-            
-            if not found_emojis:
-                logger.info("No emojis found in message text")
+                (message.entities and any(type(entity) is _MECE for entity in message.entities))):
+                logger.debug("Message already contains premium emojis or custom emoji entities, skipping replacement")
                 return
             
             # Check if replacement is enabled for this channel
@@ -1638,138 +2089,78 @@ class TelegramEmojiBot:
             replacement_enabled = self.channel_replacement_status.get(event_peer_id, True)
             
             if not replacement_enabled:
-                logger.info(f"Replacement disabled for channel {event_peer_id}, skipping")
+                logger.debug("Replacement disabled for channel %s, skipping", event_peer_id)
                 return
             
-            # Check if any of the found emojis have premium replacements
-            replacements_made = []
-            modified_text = original_text
-            
-            # Process text character by character to handle multiple same emojis correctly
-            import re
-            
-            # Create a list to track which emojis need replacement
             # Priority: Channel-specific replacements first, then global replacements
-            emojis_to_replace = {}
-            
-            for emoji in found_emojis:
-                # Check channel-specific replacements first
-                if (event_peer_id in self.channel_emoji_mappings and 
-                    emoji in self.channel_emoji_mappings[event_peer_id]):
-                    emojis_to_replace[emoji] = self.channel_emoji_mappings[event_peer_id][emoji]
-                    replacements_made.append(emoji)
-                    logger.info(f"Found channel-specific replacement for {emoji}: {self.channel_emoji_mappings[event_peer_id][emoji]}")
-                # Then check global replacements
-                elif emoji in self.emoji_mappings:
-                    emojis_to_replace[emoji] = self.emoji_mappings[emoji]
-                    replacements_made.append(emoji)
-                    logger.info(f"Found global replacement for {emoji}: {self.emoji_mappings[emoji]}")
-                else:
-                    logger.info(f"No replacement found for emoji: {emoji}")
-            
-            if not emojis_to_replace:
+            mappings = self._get_merged_mappings(event_peer_id)
+            # Insertion-ordered set of replaced emojis; lookups stay O(1) however many match
+            replacements_made: Dict[str, None] = {}
+            new_entities = []
+            
+            # Build custom emoji entities straight from the matches, tracking UTF-16 offsets
+            # incrementally; the text itself is left unchanged
+            scanned_pos = 0
+            scanned_offset = 0
+            for match in _EMOJI_PATTERN.finditer(original_text):
+                emoji = match.group(0)
+                premium_emoji_id = mappings.get(emoji)
+                if premium_emoji_id is None:
+                    # Fall back to the bare symbol when only it (not the variation/ZWJ form) is mapped,
+                    # but only for the fallback symbols extract_emojis_from_text also reports bare
+                    emoji = emoji[0]
+                    if emoji not in _FALLBACK_SYMBOLS:
+                        continue
+                    premium_emoji_id = mappings.get(emoji)
+                    if premium_emoji_id is None:
+                        continue
+                start = match.start()
+                scanned_offset += _utf16_len(original_text[scanned_pos:start])
+                scanned_pos = start
+                new_entities.append(MessageEntityCustomEmoji(
+                    offset=scanned_offset, length=_utf16_len(emoji), document_id=premium_emoji_id
+                ))
+                replacements_made[emoji] = None
+            logger.debug("Replaced emojis: %s", list(replacements_made))
+            
+            if not replacements_made:
                 return
             
-            # Use regex to replace emojis one by one to avoid conflicts
-            for normal_emoji, premium_emoji_id in emojis_to_replace.items():
-                # Escape special regex characters in emoji
-                escaped_emoji = re.escape(normal_emoji)
-                premium_emoji_markdown = f"[{normal_emoji}](emoji/{premium_emoji_id})"
-                
-                # Count occurrences before replacement
-                occurrence_count = len(re.findall(escaped_emoji, modified_text))
-                logger.info(f"Replacing {occurrence_count} occurrences of {normal_emoji} with premium emoji ID {premium_emoji_id}")
-                
-                # Replace all occurrences of this specific emoji
-                modified_text = re.sub(escaped_emoji, premium_emoji_markdown, modified_text)
-                logger.info(f"Text after replacing {normal_emoji}: '{modified_text}'")
-            
             # If replacements were made, edit the message
             if replacements_made:
                 try:
-                    # Parse the text with custom parse mode to handle premium emojis
-                    try:
-                        parsed_text, new_entities = self.parse_mode.parse(modified_text)
-                        logger.info(f"Original text: '{original_text}'")
-                        logger.info(f"Modified text with markdown: '{modified_text}'")
-                        logger.info(f"Parsed text after parse_mode: '{parsed_text}'")
-                    except Exception as parse_error:
-                        logger.error(f"Failed to parse premium emojis in text: {parse_error}")
-                        logger.error(f"Modified text: {modified_text}")
-                        return
-                    
                     # Don't check if parsed text equals original text - we need to proceed with editing
                     # to apply the premium emoji entities even if the text looks the same
                     
                     # Merge new premium emoji entities with existing formatting entities
                     # This preserves bold, italic, and other formatting while adding premium emojis
-                    final_entities = []
-                    
                     # Add existing non-emoji entities (bold, italic, links, etc.)
-                    if message.entities:
-                        for entity in message.entities:
-                            # Skip existing custom emoji entities as they'll be replaced
-                            if not hasattr(entity, 'document_id'):
-                                final_entities.append(entity)
+                    final_entities = [
+                        entity for entity in message.entities or ()
+                        if type(entity) is not _MECE
+                    ]
                     
                     # Add new premium emoji entities
-                    if new_entities:
-                        for entity in new_entities:
-                            # Only add custom emoji entities from the parsed text
-                            if hasattr(entity, 'document_id'):
-                                final_entities.append(entity)
+                    final_entities.extend(new_entities)
                     
                     # Sort entities by offset to maintain proper order
                     final_entities.sort(key=lambda e: e.offset)
                     
-                    # Check if we actually have new custom emoji entities to add
-                    should_edit = True
-                    new_custom_emoji_count = sum(1 for entity in new_entities if hasattr(entity, 'document_id'))
-                    
-                    if new_custom_emoji_count == 0:
-                        should_edit = False
-                        logger.info(f"No new custom emoji entities to add for message {message.id}, skipping edit")
-                    else:
-                        # Compare with existing custom emojis to avoid duplicate edits
-                        if message.entities:
-                            existing_custom_emojis = []
-                            new_custom_emojis = []
-                            
-                            for entity in message.entities:
-                                if hasattr(entity, 'document_id'):
-                                    existing_custom_emojis.append((entity.offset, entity.length, entity.document_id))
-                            
-                            for entity in final_entities:
-                                if hasattr(entity, 'document_id'):
-                                    new_custom_emojis.append((entity.offset, entity.length, entity.document_id))
-                            
-                            if existing_custom_emojis == new_custom_emojis:
-                                should_edit = False
-                                logger.info(f"Message {message.id} already has identical custom emoji entities, skipping edit")
-                            else:
-                                logger.info(f"Message {message.id} has different emoji entities, proceeding with edit")
-                                logger.info(f"Existing: {existing_custom_emojis}")
-                                logger.info(f"New: {new_custom_emojis}")
+                    # Messages that already carry custom emoji entities returned before scanning,
+                    # so every entity built above is new and the edit always changes the message
+                    new_custom_emoji_count = len(new_entities)
                     
-                    if should_edit:
+                    if new_custom_emoji_count:
                         try:
                             # Edit the original message with merged entities
-                            await self.client.edit_message(
-                                event.chat_id,
-                                message.id,
-                                parsed_text,
-                                formatting_entities=final_entities,
-                                parse_mode=None  # Use raw entities to preserve everything
-                            )
+                            await self._edit_message(event.chat_id, message.id, original_text, final_entities)
                             
-                            logger.info(f"Successfully replaced emojis in message {message.id} while preserving {len(final_entities)} total formatting entities: {list(emojis_to_replace.keys())}")
-                            logger.info(f"Final message contains {sum(1 for entity in final_entities if hasattr(entity, 'document_id'))} premium emojis")
+                            logger.info(f"Successfully replaced emojis in message {message.id} while preserving {len(final_entities)} total formatting entities: {list(replacements_made)}")
+                            logger.debug("Final message contains %d premium emojis", new_custom_emoji_count)
                             
                         except Exception as edit_error:
                             logger.error(f"Failed to edit message {message.id}: {edit_error}")
                             logger.error(f"Original text: '{original_text}'")
-                            logger.error(f"Modified text: '{modified_text}'")
-                            logger.error(f"Parsed text: '{parsed_text}'")
                             logger.error(f"Final entities count: {len(final_entities)}")
                             raise  # Re-raise to ensure the error is handled properly
                     
@@ -1781,8 +2172,6 @@ class TelegramEmojiBot:
                         logger.error(f"Failed to edit message {message.id}: {edit_error}")
                         logger.error(f"Final entities count: {len(final_entities) if 'final_entities' in locals() else 'unknown'}")
                         logger.error(f"Original text: '{original_text}'")
-                        logger.error(f"Modified text: '{modified_text}'")
-                        logger.error(f"Parsed text: '{parsed_text if 'parsed_text' in locals() else 'unknown'}')")
             
         except Exception as e:
             logger.error(f"Failed to replace emojis in message: {e}")
@@ -1824,23 +2213,25 @@ class TelegramEmojiBot:
                 logger.warning(f"Private message missing chat_id ({chat_id}) or sender_id ({sender_id}), skipping")
                 return
                 
-            logger.info(f"Handling private message: '{message_text}' from chat {chat_id}, sender: {sender_id}")
+            logger.debug("Handling private message: '%s' from chat %s, sender: %s", message_text, chat_id, sender_id)
             
             # Check if sender is authorized (session owner OR admin)
             try:
-                me = await self.client.get_me()
-                bot_owner_id = me.id
+                # The session owner never changes while running; fetch it only if start() hasn't
+                if self.userbot_admin_id is None:
+                    self.userbot_admin_id = (await self._get_me_cached()).id
+                    self._refresh_authorized_ids()
                 
                 # Allow commands from:
                 # 1. Bot owner (session owner)
                 # 2. Authorized admins
-                is_authorized = (sender_id == bot_owner_id) or (sender_id in self.admin_ids)
+                is_authorized = sender_id in self._authorized_ids
                 
                 if not is_authorized:
                     logger.info(f"Message from unauthorized user {sender_id} - ignoring silently")
                     return
                     
-                logger.info(f"Authorized user {sender_id} - processing command")
+                logger.debug("Authorized user %s - processing command", sender_id)
                 
             except Exception as e:
                 logger.error(f"Error checking user authorization: {e}")
@@ -1853,109 +2244,82 @@ class TelegramEmojiBot:
             
             # Parse command and arguments
             parts = message_text.split(None, 1)
-            command = parts[0]
+            command = sys.intern(parts[0])
             args = parts[1] if len(parts) > 1 else ""
-            logger.info(f"Parsed command: '{command}', args: '{args}'")
-            
-            # Find matching Arabic command - exact match first, then startswith
-            command_handler = None
-            
-            # Try exact match first
-            if command in self.arabic_commands:
-                handler_name = self.arabic_commands[command]
-                logger.info(f"Found exact command match: {command} -> {handler_name}")
-                command_handler = getattr(self, f"cmd_{handler_name}", None)
-            elif command.startswith('/') and command[1:] in self.arabic_commands:
-                handler_name = self.arabic_commands[command[1:]]
-                logger.info(f"Found exact command match with slash: {command} -> {handler_name}")
-                command_handler = getattr(self, f"cmd_{handler_name}", None)
-            else:
-                # Fall back to startswith for partial matches
-                for arabic_cmd, handler_name in self.arabic_commands.items():
-                    logger.info(f"Checking command '{command}' against '{arabic_cmd}'")
-                    if command.startswith(arabic_cmd) or command.startswith(f"/{arabic_cmd}"):
-                        logger.info(f"Found matching command: {arabic_cmd} -> {handler_name}")
-                        command_handler = getattr(self, f"cmd_{handler_name}", None)
-                        logger.info(f"Handler method: {command_handler}")
+            logger.debug("Parsed command: '%s', args: '%s'", command, args)
+            
+            # Exact match first, then the longest registered command that prefixes the input
+            command_handler = self._cmd_handlers.get(command)
+            if command_handler is None:
+                node = self._cmd_trie
+                for ch in command:
+                    node = node.get(ch)
+                    if node is None:
                         break
+                    command_handler = node.get(_TRIE_END, command_handler)
             
             if command_handler:
                 logger.info(f"Executing command handler: {command_handler.__name__}")
                 await command_handler(event, args)
-                logger.info("Command handler executed successfully")
+                logger.debug("Command handler executed successfully")
             else:
-                logger.info("No matching command found, ignoring silently")
+                logger.debug("No matching command found, ignoring silently")
                 # Silently ignore unknown commands instead of sending error message
                 
         except Exception as e:
             logger.error(f"Failed to handle private message: {e}")
             await event.reply("حدث خطأ أثناء معالجة الأمر.")
 
+    async def _send_premium_response(self, event, response_text: str, context: str) -> bool:
+        """Send a response with premium emoji markdown, falling back to plain text if that fails"""
+        try:
+            plain_text, entities = _premium_markdown_to_entities(response_text)
+            await self.client.send_message(event.chat_id, plain_text, formatting_entities=entities)
+            return True
+        except Exception as send_error:
+            logger.error(f"Failed to send premium emojis in {context}: {send_error}")
+            await event.reply(_PREMIUM_EMOJI_MD_RE.sub(_PREMIUM_EMOJI_PLACEHOLDER, response_text))
+            return False
+
     async def cmd_add_emoji_replacement(self, event, args: str):
         """Handle add emoji replacement command - supports single or multiple replacements and reply messages"""
         try:
-            # Check if this is a reply to a message
+            no_args = not args or args.isspace()
+            
+            # Get all custom emojis from the message
+            custom_emoji_ids = [e.document_id for e in (event.message.entities or ()) if type(e) is _MECE]
+            
+            # Fetch the replied-to message only when the command itself carries no replacement to add
             reply_message = None
-            if event.message.is_reply:
+            if event.message.is_reply and (no_args or not custom_emoji_ids):
                 reply_message = await event.message.get_reply_message()
             
-            # Check if args contain multiple lines (multiple replacements)
-            lines = args.strip().split('\n')
-            
-            if not args.strip() and not reply_message:
-                await event.reply("""
-📋 الاستخدام: إضافة_استبدال
-
-🔸 استبدال واحد:
-إضافة_استبدال <إيموجي_عادي> <إيموجي_مميز> [وصف]
-
-🔸 عدة إيموجيات عادية لإيموجي مميز واحد:
-إضافة_استبدال ✅,🟢,☑️ <إيموجي_مميز> [وصف]
-
-🔸 عدة استبدالات (كل سطر منفصل):
-إضافة_استبدال
-😀 🔥 وصف أول
-❤️,💖,💕 1234567890 وصف ثاني
-✅ ✨ وصف ثالث
-
-🔸 الرد على رسالة:
-رد على رسالة تحتوي على إيموجيات عادية ومميزة بـ "إضافة_استبدال [وصف]"
-
-💡 يمكنك استخدام الإيموجي المميز مباشرة أو معرفه الرقمي
-💡 فصل الإيموجيات العادية بفاصلة (,) لربطها بنفس الإيموجي المميز
-                """.strip())
+            if no_args and not reply_message:
+                await event.reply(_ADD_USAGE_HELP)
                 return
             
             # Handle reply message mode
             if reply_message:
                 return await self._handle_reply_emoji_replacement(event, reply_message, args.strip())
             
-            # Get all custom emojis from the message
-            custom_emoji_ids = []
-            if event.message.entities:
-                for entity in event.message.entities:
-                    if isinstance(entity, MessageEntityCustomEmoji):
-                        custom_emoji_ids.append(entity.document_id)
-            
             successful_replacements = []
             failed_replacements = []
             custom_emoji_index = 0
             
-            # Process each line
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line:
+            # Rows from every line are saved together in one transaction after parsing
+            pending_rows = []
+            pending_lines = []  # (line_num, new_emojis, premium_emoji_id)
+            pending_emojis = set()
+            
+            # Process each line: "normal_emoji(s) premium_emoji/id description"
+            for line_num, match in enumerate(_LINE_RE.finditer(args), 1):
+                normal_emojis_part, premium_part, description = match.groups()
+                if normal_emojis_part is None:
                     continue
-                
-                # Parse line: "normal_emoji(s) premium_emoji/id description"
-                parts = line.split(None, 2)
-                if len(parts) < 2:
+                if premium_part is None:
                     failed_replacements.append(f"السطر {line_num}: تنسيق غير صحيح")
                     continue
-                
-                normal_emojis_part = parts[0]
-                premium_part = parts[1]
-                description = parts[2] if len(parts) > 2 else None
+                description = description or None
                 
                 # Split normal emojis by comma to support multiple emojis
                 normal_emojis = [emoji.strip() for emoji in normal_emojis_part.split(',') if emoji.strip()]
@@ -1967,10 +2331,10 @@ class TelegramEmojiBot:
                 # Try to determine premium emoji ID
                 premium_emoji_id = None
                 
-                # Method 1: Try to parse as number (ID format)
-                try:
+                # Method 1: Parse as number (ID format)
+                if premium_part.isdecimal():
                     premium_emoji_id = int(premium_part)
-                except ValueError:
+                else:
                     # Method 2: Check if it's a premium emoji in the message
                     # We need to find which custom emoji corresponds to this position
                     if custom_emoji_index < len(custom_emoji_ids):
@@ -1981,82 +2345,58 @@ class TelegramEmojiBot:
                         failed_replacements.append(f"السطر {line_num}: لم أجد إيموجي مميز أو معرف صحيح")
                         continue
                 
-                # Check which emojis are new and which already exist
-                new_emojis = []
-                existing_emojis = []
-                
-                for normal_emoji in normal_emojis:
-                    if normal_emoji in self.emoji_mappings:
-                        existing_emojis.append(normal_emoji)
-                    else:
-                        new_emojis.append(normal_emoji)
-                
-                # Add replacements only for new emojis
-                line_success_count = 0
-                line_failed_emojis = []
-                
-                for normal_emoji in new_emojis:
-                    success = await self.add_emoji_replacement(normal_emoji, premium_emoji_id, description)
-                    
-                    if success:
-                        line_success_count += 1
-                    else:
-                        line_failed_emojis.append(normal_emoji)
+                # Check which emojis are new and which already exist (saved or queued by an earlier line)
+                normal_set = set(normal_emojis)
+                existing = (normal_set & self.emoji_mappings.keys()) | (normal_set & pending_emojis)
+                if existing:
+                    new_emojis = [e for e in normal_emojis if e not in existing]
+                    existing_emojis = [e for e in normal_emojis if e in existing]
+                else:
+                    new_emojis = normal_emojis
+                    existing_emojis = []
                 
-                # Report results for this line with premium emoji display
-                if line_success_count > 0:
-                    emoji_list = ", ".join(new_emojis[:line_success_count])
-                    premium_emoji_markdown = f"[💎](emoji/{premium_emoji_id})"
-                    successful_replacements.append(f"{emoji_list} → {premium_emoji_markdown} (ID: {premium_emoji_id})")
+                # Queue replacements only for new emojis
+                if new_emojis:
+                    pending_emojis.update(new_emojis)
+                    pending_rows.extend((normal_emoji, premium_emoji_id, description) for normal_emoji in new_emojis)
+                    pending_lines.append((line_num, new_emojis, premium_emoji_id))
                 
                 if existing_emojis:
                     existing_emoji_list = ", ".join(existing_emojis)
                     failed_replacements.append(f"السطر {line_num}: موجود مسبقاً: {existing_emoji_list}")
-                
-                if line_failed_emojis:
-                    failed_emoji_list = ", ".join(line_failed_emojis)
-                    failed_replacements.append(f"السطر {line_num}: فشل في حفظ {failed_emoji_list}")
+            
+            # Save all new replacements in one round trip
+            saved = await self.add_emoji_replacements_bulk(pending_rows) if pending_rows else 0
+            
+            # Report results per line with premium emoji display
+            for line_num, new_emojis, premium_emoji_id in pending_lines:
+                emoji_list = ", ".join(new_emojis)
+                if saved:
+                    premium_emoji_markdown = f"[💎](emoji/{premium_emoji_id})"
+                    successful_replacements.append(f"{emoji_list} → {premium_emoji_markdown} (ID: {premium_emoji_id})")
+                else:
+                    failed_replacements.append(f"السطر {line_num}: فشل في حفظ {emoji_list}")
             
             # Prepare response with premium emojis
             response_parts = []
-            fallback_parts = []
             
             if successful_replacements:
                 response_parts.append("✅ تم إضافة الاستبدالات التالية بنجاح:")
-                fallback_parts.append("✅ تم إضافة الاستبدالات التالية بنجاح:")
-                for replacement in successful_replacements:
-                    response_parts.append(f"• {replacement}")
-                    # Create fallback version
-                    fallback_parts.append(f"• {replacement.replace('إيموجي مميز', 'إيموجي مميز')}")
+                response_parts.extend(f"• {replacement}" for replacement in successful_replacements)
             
             if failed_replacements:
                 if successful_replacements:
-                    response_parts.append("")
-                    fallback_parts.append("")
-                response_parts.append("❌ فشل في إضافة الاستبدالات التالية:")
-                fallback_parts.append("❌ فشل في إضافة الاستبدالات التالية:")
-                for failure in failed_replacements:
-                    response_parts.append(f"• {failure}")
-                    fallback_parts.append(f"• {failure}")
+                    response_parts.append("")
+                response_parts.append("❌ فشل في إضافة الاستبدالات التالية:")
+                response_parts.extend(f"• {failure}" for failure in failed_replacements)
             
             if not successful_replacements and not failed_replacements:
                 response_parts.append("❌ لم يتم العثور على استبدالات صالحة")
-                fallback_parts.append("❌ لم يتم العثور على استبدالات صالحة")
             
             # Try to send with premium emojis first
-            try:
-                response_text = "\n".join(response_parts)
-                parsed_text, entities = self.parse_mode.parse(response_text)
-                await self.client.send_message(
-                    event.chat_id,
-                    parsed_text,
-                    formatting_entities=entities
-                )
-            except Exception as parse_error:
-                logger.error(f"Failed to parse premium emojis in add_emoji_replacement response: {parse_error}")
-                # Use fallback format
-                fallback_response = "\n".join(fallback_parts)
-                await event.reply(fallback_response)
+            await self._send_premium_response(
+                event, "\n".join(response_parts), "add_emoji_replacement response"
+            )
                 
         except Exception as e:
             logger.error(f"Failed to add emoji replacement: {e}")
@@ -2070,11 +2410,7 @@ class TelegramEmojiBot:
             normal_emojis = self.extract_emojis_from_text(reply_text)
             
             # Get custom emojis from reply message
-            custom_emoji_ids = []
-            if reply_message.entities:
-                for entity in reply_message.entities:
-                    if isinstance(entity, MessageEntityCustomEmoji):
-                        custom_emoji_ids.append(entity.document_id)
+            custom_emoji_ids = [e.document_id for e in (reply_message.entities or ()) if type(e) is _MECE]
             
             if not normal_emojis and not custom_emoji_ids:
                 await event.reply("❌ الرسالة المردود عليها لا تحتوي على إيموجيات")
@@ -2095,22 +2431,24 @@ class TelegramEmojiBot:
                 await event.reply("❌ الرسالة المردود عليها لا تحتوي على إيموجيات عادية")
                 return
             
-            # Process each normal emoji
-            for normal_emoji in normal_emojis:
-                if normal_emoji in self.emoji_mappings:
-                    existing_emojis.append(normal_emoji)
-                    continue
-                
-                success = await self.add_emoji_replacement(normal_emoji, premium_emoji_id, description or f"من الرد على الرسالة")
-                
-                if success:
-                    successful_replacements.append(normal_emoji)
-                else:
-                    failed_replacements.append(normal_emoji)
+            # Split normal emojis into new and already mapped ones
+            existing = self.emoji_mappings.keys() & normal_emojis
+            if existing:
+                new_emojis = [e for e in normal_emojis if e not in existing]
+                existing_emojis = [e for e in normal_emojis if e in existing]
+            else:
+                new_emojis = normal_emojis
+            
+            reply_description = description or "من الرد على الرسالة"
+            if await self.add_emoji_replacements_bulk(
+                [(normal_emoji, premium_emoji_id, reply_description) for normal_emoji in new_emojis]
+            ):
+                successful_replacements = new_emojis
+            else:
+                failed_replacements = new_emojis
             
             # Prepare response with premium emoji display
             response_parts = []
-            fallback_parts = []
             
             if successful_replacements:
                 emoji_list = ", ".join(successful_replacements)
@@ -2118,42 +2456,24 @@ class TelegramEmojiBot:
                 
                 response_parts.append(f"✅ تم إضافة الاستبدالات التالية بنجاح:")
                 response_parts.append(f"• {emoji_list} → {premium_emoji_markdown} (ID: {premium_emoji_id})")
-                
-                fallback_parts.append(f"✅ تم إضافة الاستبدالات التالية بنجاح:")
-                fallback_parts.append(f"• {emoji_list} → إيموجي مميز (ID: {premium_emoji_id})")
             
             if existing_emojis:
                 if successful_replacements:
                     response_parts.append("")
-                    fallback_parts.append("")
                 response_parts.append(f"⚠️ موجود مسبقاً: {', '.join(existing_emojis)}")
-                fallback_parts.append(f"⚠️ موجود مسبقاً: {', '.join(existing_emojis)}")
             
             if failed_replacements:
                 if successful_replacements or existing_emojis:
                     response_parts.append("")
-                    fallback_parts.append("")
                 response_parts.append(f"❌ فشل في إضافة: {', '.join(failed_replacements)}")
-                fallback_parts.append(f"❌ فشل في إضافة: {', '.join(failed_replacements)}")
             
             if not response_parts:
                 response_parts.append("❌ لم يتم إضافة أي استبدالات")
-                fallback_parts.append("❌ لم يتم إضافة أي استبدالات")
             
             # Try to send with premium emojis first
-            try:
-                response_text = "\n".join(response_parts)
-                parsed_text, entities = self.parse_mode.parse(response_text)
-                await self.client.send_message(
-                    event.chat_id,
-                    parsed_text,
-                    formatting_entities=entities
-                )
-            except Exception as parse_error:
-                logger.error(f"Failed to parse premium emojis in reply replacement response: {parse_error}")
-                # Use fallback format
-                fallback_response = "\n".join(fallback_parts)
-                await event.reply(fallback_response)
+            await self._send_premium_response(
+                event, "\n".join(response_parts), "reply replacement response"
+            )
             
         except Exception as e:
             logger.error(f"Failed to handle reply emoji replacement: {e}")
@@ -2166,35 +2486,19 @@ class TelegramEmojiBot:
                 await event.reply("لا توجد استبدالات إيموجي محفوظة")
                 return
             
-            # Create response parts for both methods
-            response_parts = ["📋 قائمة استبدالات الإيموجي:\n"]
-            fallback_parts = ["📋 قائمة استبدالات الإيموجي:\n"]
-            
-            for normal_emoji, premium_id in self.emoji_mappings.items():
+            # Render once per change
+            if self._list_cache is None:
                 # For premium emoji display: normal → premium → (ID)
-                premium_emoji_markdown = f"[💎](emoji/{premium_id})"
-                response_parts.append(f"{normal_emoji} → {premium_emoji_markdown} → (ID: {premium_id})")
-                
-                # Fallback format
-                fallback_parts.append(f"{normal_emoji} → إيموجي مميز → (ID: {premium_id})")
+                buf = io.StringIO()
+                buf.write("📋 قائمة استبدالات الإيموجي:\n")
+                for normal_emoji, premium_id in self.emoji_mappings.items():
+                    buf.write(f"\n{normal_emoji} → [💎](emoji/{premium_id}) → (ID: {premium_id})")
+                self._list_cache = buf.getvalue()
             
             # Try to send with premium emojis first
-            try:
-                response_text = "\n".join(response_parts)
-                parsed_text, entities = self.parse_mode.parse(response_text)
-                
-                await self.client.send_message(
-                    event.chat_id,
-                    parsed_text,
-                    formatting_entities=entities
-                )
+            if await self._send_premium_response(event, self._list_cache, "list"):
                 logger.info("Successfully sent emoji list with premium emojis")
-                
-            except Exception as parse_error:
-                logger.error(f"Failed to parse premium emojis in list: {parse_error}")
-                # Use fallback format
-                fallback_response = "\n".join(fallback_parts)
-                await event.reply(fallback_response)
+            else:
                 logger.info("Sent emoji list using fallback format")
             
         except Exception as e:
@@ -2223,21 +2527,14 @@ class TelegramEmojiBot:
     async def cmd_delete_all_emoji_replacements(self, event, args: str):
         """Handle delete all emoji replacements command"""
         try:
+            mapping_count = len(self.emoji_mappings)
+            
             # Check if user provided confirmation
             if args.strip().lower() != "تأكيد":
-                await event.reply("""
-⚠️ تحذير: هذا الأمر سيحذف جميع الاستبدالات العامة!
-
-📊 الاستبدالات الحالية: {} استبدال
-
-🔴 لتأكيد الحذف، أرسل:
-حذف_جميع_الاستبدالات تأكيد
-
-💡 يمكنك استخدام أمر "عرض_الاستبدالات" لرؤية القائمة قبل الحذف
-                """.format(len(self.emoji_mappings)).strip())
+                await event.reply(_DELETE_ALL_WARN_TEMPLATE.format(mapping_count))
                 return
             
-            if not self.emoji_mappings:
+            if mapping_count == 0:
                 await event.reply("لا توجد استبدالات عامة لحذفها")
                 return
             
@@ -2259,67 +2556,45 @@ class TelegramEmojiBot:
                 await event.reply("❌ قاعدة البيانات غير متاحة")
                 return
             
-            async with self.db_pool.acquire() as conn:
-                # Get all replacements with their creation times
-                rows = await conn.fetch("""
-                    SELECT normal_emoji, premium_emoji_id, description, created_at 
-                    FROM emoji_replacements 
-                    ORDER BY normal_emoji, created_at DESC
-                """)
-                
-                if not rows:
-                    await event.reply("❌ لا توجد استبدالات في قاعدة البيانات")
-                    return
-                
-                # Group by emoji and find duplicates
-                emoji_groups = {}
-                for row in rows:
-                    emoji = row['normal_emoji']
-                    if emoji not in emoji_groups:
-                        emoji_groups[emoji] = []
-                    emoji_groups[emoji].append(row)
-                
-                # Find duplicates and clean them
-                cleaned_count = 0
-                duplicate_report = []
-                
-                for emoji, entries in emoji_groups.items():
-                    if len(entries) > 1:
-                        # Keep the most recent (first in DESC order)
-                        keep_entry = entries[0]
-                        delete_entries = entries[1:]
-                        
-                        duplicate_report.append(f"🔄 {emoji}:")
-                        duplicate_report.append(f"   ✅ احتفظ بـ: ID {keep_entry['premium_emoji_id']} ({keep_entry['created_at']})")
-                        
-                        # Delete older duplicates
-                        for old_entry in delete_entries:
-                            await conn.execute(
-                                "DELETE FROM emoji_replacements WHERE normal_emoji = $1 AND premium_emoji_id = $2 AND created_at = $3",
-                                old_entry['normal_emoji'], old_entry['premium_emoji_id'], old_entry['created_at']
-                            )
-                            duplicate_report.append(f"   ❌ حذف: ID {old_entry['premium_emoji_id']} ({old_entry['created_at']})")
-                            cleaned_count += 1
-                
-                # Reload cache after cleaning
-                await self.load_emoji_mappings()
-                
-                # Prepare response
-                if cleaned_count > 0:
-                    response = f"🧹 تم تنظيف {cleaned_count} استبدال مكرر:\n\n"
-                    response += "\n".join(duplicate_report)
-                    response += f"\n\n✅ تم إعادة تحميل {len(self.emoji_mappings)} استبدال نشط"
+            # Find and delete older duplicates server-side and read back the survivors in the same transaction
+            async def clean(conn):
+                deleted_rows = await conn.fetch(_SQL_DELETE_DUPLICATE_EMOJI_REPLACEMENTS)
+                return deleted_rows, await conn.fetch(_SQL_SELECT_EMOJI_MAPPINGS)
+            
+            rows, mapping_rows = await self._with_conn(clean)
+            # Only touch the cache once the transaction has committed
+            self._set_emoji_mappings(mapping_rows)
+            
+            cleaned_count = 0
+            duplicate_report = []
+            for row in rows:
+                if row['deleted']:
+                    duplicate_report.append(f"   ❌ حذف: ID {row['premium_emoji_id']} ({row['created_at']})")
+                    cleaned_count += 1
                 else:
-                    response = "✅ لا توجد استبدالات مكررة. قاعدة البيانات نظيفة!"
-                    
-                    # Show current mappings summary
-                    response += f"\n\n📊 الاستبدالات الحالية: {len(self.emoji_mappings)}"
-                    if args.strip().lower() == "تفصيل":
-                        response += "\n\n📋 التفاصيل:"
-                        for emoji, emoji_id in self.emoji_mappings.items():
-                            response += f"\n• {emoji} → ID: {emoji_id}"
+                    duplicate_report.append(f"🔄 {row['normal_emoji']}:")
+                    duplicate_report.append(f"   ✅ احتفظ بـ: ID {row['premium_emoji_id']} ({row['created_at']})")
+            
+            if not cleaned_count and not self.emoji_mappings:
+                await event.reply("❌ لا توجد استبدالات في قاعدة البيانات")
+                return
+            
+            # Prepare response
+            if cleaned_count > 0:
+                response = f"🧹 تم تنظيف {cleaned_count} استبدال مكرر:\n\n"
+                response += "\n".join(duplicate_report)
+                response += f"\n\n✅ تم إعادة تحميل {len(self.emoji_mappings)} استبدال نشط"
+            else:
+                response = "✅ لا توجد استبدالات مكررة. قاعدة البيانات نظيفة!"
                 
-                await event.reply(response)
+                # Show current mappings summary
+                response += f"\n\n📊 الاستبدالات الحالية: {len(self.emoji_mappings)}"
+                if args.strip().lower() == "تفصيل":
+                    response += "\n\n📋 التفاصيل:" + "".join(
+                        f"\n• {emoji} → ID: {emoji_id}" for emoji, emoji_id in self.emoji_mappings.items()
+                    )
+            
+            await event.reply(response)
                 
         except Exception as e:
             logger.error(f"Failed to clean duplicate replacements: {e}")
@@ -2349,7 +2624,7 @@ class TelegramEmojiBot:
                     # Check bot permissions in the channel
                     try:
                         # Get the bot's participant info in the channel
-                        me = await self.client.get_me()
+                        me = await self._get_me_cached()
                         participant = await self.client.get_permissions(channel_entity, me)
                         
                         # Check if bot is admin
@@ -2470,7 +2745,7 @@ class TelegramEmojiBot:
                     
                     # Check bot permissions
                     try:
-                        me = await self.client.get_me()
+                        me = await self._get_me_cached()
                         participant = await self.client.get_permissions(channel_entity, me)
                         
                         if not participant.is_admin:
@@ -2530,11 +2805,11 @@ class TelegramEmojiBot:
             if channel_id is None:
                 return "❌ لا يمكن العثور على القناة"
             
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 return "❌ القناة غير موجودة في قائمة المراقبة"
             
             # Get info before deletion
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
             emoji_count = len(self.channel_emoji_mappings.get(channel_id, {}))
             
@@ -2568,7 +2843,7 @@ class TelegramEmojiBot:
                     channel_title = getattr(channel_entity, 'title', 'Unknown Channel')
                     
                     try:
-                        me = await self.client.get_me()
+                        me = await self._get_me_cached()
                         participant = await self.client.get_permissions(channel_entity, me)
                         
                         permissions_text = await self.format_permissions_text(participant, channel_title, channel_username)
@@ -2645,7 +2920,7 @@ class TelegramEmojiBot:
             if normal_emoji not in self.emoji_mappings:
                 return f"❌ الإيموجي {normal_emoji} غير موجود في قائمة الاستبدالات"
             
-            success = await self.delete_emoji_replacement(normal_emoji)
+            success = await self.submit_write(lambda: self.delete_emoji_replacement(normal_emoji))
             
             if success:
                 return f"✅ تم حذف استبدال الإيموجي: {normal_emoji}"
@@ -2661,43 +2936,20 @@ class TelegramEmojiBot:
             if self.db_pool is None:
                 return "❌ قاعدة البيانات غير متاحة"
             
-            async with self.db_pool.acquire() as conn:
-                # Get duplicates
-                rows = await conn.fetch("""
-                    SELECT normal_emoji, premium_emoji_id, created_at 
-                    FROM emoji_replacements 
-                    ORDER BY normal_emoji, created_at DESC
-                """)
-                
-                if not rows:
-                    return "❌ لا توجد استبدالات في قاعدة البيانات"
-                
-                # Find and clean duplicates
-                emoji_groups = {}
-                for row in rows:
-                    emoji = row['normal_emoji']
-                    if emoji not in emoji_groups:
-                        emoji_groups[emoji] = []
-                    emoji_groups[emoji].append(row)
-                
-                cleaned_count = 0
-                for emoji, entries in emoji_groups.items():
-                    if len(entries) > 1:
-                        # Delete older duplicates (keep first - most recent)
-                        for old_entry in entries[1:]:
-                            await conn.execute(
-                                "DELETE FROM emoji_replacements WHERE normal_emoji = $1 AND premium_emoji_id = $2 AND created_at = $3",
-                                old_entry['normal_emoji'], old_entry['premium_emoji_id'], old_entry['created_at']
-                            )
-                            cleaned_count += 1
-                
-                # Reload cache
-                await self.load_emoji_mappings()
-                
-                if cleaned_count > 0:
-                    return f"🧹 تم تنظيف {cleaned_count} استبدال مكرر\n✅ تم إعادة تحميل {len(self.emoji_mappings)} استبدال نشط"
-                else:
-                    return f"✅ لا توجد استبدالات مكررة\n📊 الاستبدالات الحالية: {len(self.emoji_mappings)}"
+            # Delete older duplicates server-side, keeping the most recent per emoji, and read back the survivors
+            async def clean(conn):
+                removed = await conn.fetchval(_SQL_COUNT_DELETE_DUPLICATE_EMOJI_REPLACEMENTS)
+                return removed, await conn.fetch(_SQL_SELECT_EMOJI_MAPPINGS)
+            
+            cleaned_count, mapping_rows = await self.submit_write(lambda: self._with_conn(clean))
+            # Only touch the cache once the transaction has committed
+            self._set_emoji_mappings(mapping_rows)
+            
+            if cleaned_count > 0:
+                return f"🧹 تم تنظيف {cleaned_count} استبدال مكرر\n✅ تم إعادة تحميل {len(self.emoji_mappings)} استبدال نشط"
+            if not self.emoji_mappings:
+                return "❌ لا توجد استبدالات في قاعدة البيانات"
+            return f"✅ لا توجد استبدالات مكررة\n📊 الاستبدالات الحالية: {len(self.emoji_mappings)}"
                     
         except Exception as e:
             return f"❌ حدث خطأ في تنظيف الاستبدالات: {str(e)}"
@@ -2719,10 +2971,10 @@ class TelegramEmojiBot:
             if channel_id is None:
                 return "❌ لا يمكن العثور على القناة"
             
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 return "❌ القناة غير مراقبة"
             
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', 'Unknown Channel')
             
             channel_mappings = self.channel_emoji_mappings.get(channel_id, {})
@@ -2730,47 +2982,55 @@ class TelegramEmojiBot:
             if not channel_mappings:
                 return f"لا توجد استبدالات خاصة بالقناة: **{channel_name}**"
             
-            result = f"🎯 **استبدالات القناة {channel_name}**\n\n"
-            for normal_emoji, premium_id in channel_mappings.items():
-                result += f"• {normal_emoji} → معرف: `{premium_id}`\n"
-            
-            return result
+            parts = [f"🎯 **استبدالات القناة {channel_name}**\n\n"]
+            parts.extend(f"• {normal_emoji} → معرف: `{premium_id}`\n" for normal_emoji, premium_id in channel_mappings.items())
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ حدث خطأ: {str(e)}"
 
+    async def _telegram_healthcheck(self):
+        """Return the session owner's User, raising if the client is disconnected"""
+        if not self.client.is_connected():
+            raise ConnectionError("disconnected")
+        return await self._get_me_cached()
+
+    async def _db_healthcheck(self) -> Optional[bool]:
+        """Round-trip a trivial query through the pool; None when there is no pool"""
+        if self.db_pool is None:
+            return None
+        return await self.db_pool.fetchval("SELECT 1") == 1
+
     async def test_system_connection(self) -> str:
         """Test system connections and status"""
         try:
             results = []
             
-            # Test Telegram connection
-            try:
-                me = await self.client.get_me()
+            # Test Telegram and database connections concurrently
+            me, db_ok = await asyncio.gather(
+                self._telegram_healthcheck(), self._db_healthcheck(), return_exceptions=True
+            )
+            
+            if isinstance(me, Exception):
+                results.append(f"❌ اتصال Telegram: خطأ - {str(me)}")
+            else:
                 results.append("✅ اتصال Telegram: متصل")
                 results.append(f"   👤 البوت: {getattr(me, 'first_name', 'Unknown')} (@{getattr(me, 'username', 'Unknown')})")
-            except Exception as e:
-                results.append(f"❌ اتصال Telegram: خطأ - {str(e)}")
             
-            # Test database connection
-            if self.db_pool:
-                try:
-                    async with self.db_pool.acquire() as conn:
-                        test_result = await conn.fetchval("SELECT 1")
-                        if test_result == 1:
-                            results.append("✅ قاعدة البيانات: متصلة")
-                        else:
-                            results.append("❌ قاعدة البيانات: استجابة غير متوقعة")
-                except Exception as e:
-                    results.append(f"❌ قاعدة البيانات: خطأ - {str(e)}")
-            else:
+            if isinstance(db_ok, Exception):
+                results.append(f"❌ قاعدة البيانات: خطأ - {str(db_ok)}")
+            elif db_ok is None:
                 results.append("❌ قاعدة البيانات: غير متصلة")
+            elif db_ok:
+                results.append("✅ قاعدة البيانات: متصلة")
+            else:
+                results.append("❌ قاعدة البيانات: استجابة غير متوقعة")
             
             # Test cache status
             results.append(f"📊 البيانات المحملة:")
             results.append(f"   • القنوات: {len(self.monitored_channels)}")
             results.append(f"   • الاستبدالات العامة: {len(self.emoji_mappings)}")
-            results.append(f"   • استبدالات القنوات: {sum(len(m) for m in self.channel_emoji_mappings.values())}")
+            results.append(f"   • استبدالات القنوات: {self._channel_mapping_total}")
             results.append(f"   • مهام النسخ: {len(self.forwarding_tasks)}")
             
             return "🔍 **اختبار اتصال النظام**\n\n" + "\n".join(results)
@@ -2781,39 +3041,19 @@ class TelegramEmojiBot:
     async def sync_system_data(self) -> str:
         """Synchronize system data"""
         try:
-            results = []
-            
-            # Reload all cached data
-            try:
-                await self.load_emoji_mappings()
-                results.append(f"✅ تم تحديث الاستبدالات العامة: {len(self.emoji_mappings)}")
-            except Exception as e:
-                results.append(f"❌ خطأ في تحديث الاستبدالات العامة: {str(e)}")
-            
-            try:
-                await self.load_channel_emoji_mappings()
-                total_channel_mappings = sum(len(mappings) for mappings in self.channel_emoji_mappings.values())
-                results.append(f"✅ تم تحديث استبدالات القنوات: {total_channel_mappings}")
-            except Exception as e:
-                results.append(f"❌ خطأ في تحديث استبدالات القنوات: {str(e)}")
-            
-            try:
-                await self.load_monitored_channels()
-                results.append(f"✅ تم تحديث القنوات المراقبة: {len(self.monitored_channels)}")
-            except Exception as e:
-                results.append(f"❌ خطأ في تحديث القنوات: {str(e)}")
-            
-            try:
-                await self.load_forwarding_tasks()
-                results.append(f"✅ تم تحديث مهام النسخ: {len(self.forwarding_tasks)}")
-            except Exception as e:
-                results.append(f"❌ خطأ في تحديث مهام النسخ: {str(e)}")
-            
-            try:
-                await self.load_admin_ids()
-                results.append(f"✅ تم تحديث قائمة الأدمن: {len(self.admin_ids)}")
-            except Exception as e:
-                results.append(f"❌ خطأ في تحديث الأدمن: {str(e)}")
+            # Reload all cached data; results follow load_cached_data's loader order
+            outcomes = await self.load_cached_data(return_exceptions=True)
+            labels = (
+                (f"✅ تم تحديث الاستبدالات العامة: {len(self.emoji_mappings)}", "❌ خطأ في تحديث الاستبدالات العامة"),
+                (f"✅ تم تحديث استبدالات القنوات: {self._channel_mapping_total}", "❌ خطأ في تحديث استبدالات القنوات"),
+                (f"✅ تم تحديث القنوات المراقبة: {len(self.monitored_channels)}", "❌ خطأ في تحديث القنوات"),
+                (f"✅ تم تحديث مهام النسخ: {len(self.forwarding_tasks)}", "❌ خطأ في تحديث مهام النسخ"),
+                (f"✅ تم تحديث قائمة الأدمن: {len(self.admin_ids)}", "❌ خطأ في تحديث الأدمن"),
+            )
+            results = [
+                f"{failed}: {str(outcome)}" if isinstance(outcome, Exception) else succeeded
+                for outcome, (succeeded, failed) in zip(outcomes, labels)
+            ]
             
             return "🔄 **مزامنة البيانات**\n\n" + "\n".join(results)
             
@@ -2823,8 +3063,9 @@ class TelegramEmojiBot:
     async def get_detailed_system_report(self) -> str:
         """Generate detailed system report"""
         try:
-            # Refresh all data first
-            await self.load_cached_data()
+            # Refresh all data first, unless a reload just happened
+            if time.monotonic() - self._last_cache_refresh >= _CACHE_REFRESH_TTL:
+                await self.load_cached_data()
             
             report_lines = []
             report_lines.append("📊 **تقرير النظام المفصل**\n")
@@ -2832,7 +3073,7 @@ class TelegramEmojiBot:
             # System status
             report_lines.append("🔌 **حالة النظام:**")
             try:
-                me = await self.client.get_me()
+                me = await self._telegram_healthcheck()
                 report_lines.append(f"✅ UserBot نشط: {getattr(me, 'first_name', 'Unknown')} (@{getattr(me, 'username', 'Unknown')})")
             except:
                 report_lines.append("❌ UserBot غير متصل")
@@ -2846,20 +3087,20 @@ class TelegramEmojiBot:
             
             # Channel details
             if self.monitored_channels:
-                active_replacements = sum(1 for active in self.channel_replacement_status.values() if active)
+                active_replacements = self._active_replacement_count
                 report_lines.append(f"   • الاستبدال مفعل في: {active_replacements} قناة")
                 report_lines.append(f"   • الاستبدال معطل في: {len(self.monitored_channels) - active_replacements} قناة")
             
             # Emoji statistics
-            total_emojis = len(self.emoji_mappings) + sum(len(m) for m in self.channel_emoji_mappings.values())
+            total_emojis = len(self.emoji_mappings) + self._channel_mapping_total
             report_lines.append(f"😀 إجمالي الاستبدالات: {total_emojis}")
             report_lines.append(f"   • العامة: {len(self.emoji_mappings)}")
-            report_lines.append(f"   • خاصة بالقنوات: {sum(len(m) for m in self.channel_emoji_mappings.values())}")
+            report_lines.append(f"   • خاصة بالقنوات: {self._channel_mapping_total}")
             
             # Forwarding tasks
             report_lines.append(f"🔄 مهام النسخ النشطة: {len(self.forwarding_tasks)}")
             if self.forwarding_tasks:
-                delayed_tasks = sum(1 for task in self.forwarding_tasks.values() if task.get('delay', 0) > 0)
+                delayed_tasks = self._delayed_task_count
                 report_lines.append(f"   • مع تأخير: {delayed_tasks} مهمة")
                 report_lines.append(f"   • فورية: {len(self.forwarding_tasks) - delayed_tasks} مهمة")
             
@@ -2869,13 +3110,12 @@ class TelegramEmojiBot:
             # Performance indicators
             if self.db_pool:
                 try:
-                    async with self.db_pool.acquire() as conn:
-                        # Check recent activity
-                        recent_commands = await conn.fetchval(
-                            "SELECT COUNT(*) FROM command_queue WHERE created_at > NOW() - INTERVAL '1 hour'"
-                        ) or 0
-                        report_lines.append(f"\n⚡ **النشاط الأخير:**")
-                        report_lines.append(f"🔄 أوامر آخر ساعة: {recent_commands}")
+                    # Check recent activity
+                    recent_commands = await self.db_pool.fetchval(
+                        "SELECT COUNT(*) FROM command_queue WHERE created_at > NOW() - INTERVAL '1 hour'"
+                    ) or 0
+                    report_lines.append(f"\n⚡ **النشاط الأخير:**")
+                    report_lines.append(f"🔄 أوامر آخر ساعة: {recent_commands}")
                 except:
                     pass
             
@@ -2908,15 +3148,10 @@ class TelegramEmojiBot:
             if self.db_pool is None:
                 return "❌ قاعدة البيانات غير متاحة"
             
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE monitored_channels SET replacement_active = TRUE WHERE channel_id = $1",
-                    channel_id
-                )
-                
-                self.channel_replacement_status[channel_id] = True
-                channel_name = self.monitored_channels[channel_id].get('title', 'Unknown Channel')
-                return f"✅ تم تفعيل الاستبدال في القناة: **{channel_name}**"
+            await self.submit_write(lambda: self.db_pool.execute(_SQL_SET_REPLACEMENT_ACTIVE, channel_id, True))
+            self._set_replacement_status(channel_id, True)
+            channel_name = self.monitored_channels[channel_id].get('title', 'Unknown Channel')
+            return f"✅ تم تفعيل الاستبدال في القناة: **{channel_name}**"
                 
         except Exception as e:
             return f"❌ حدث خطأ: {str(e)}"
@@ -2935,15 +3170,10 @@ class TelegramEmojiBot:
             if self.db_pool is None:
                 return "❌ قاعدة البيانات غير متاحة"
             
-            async with self.db_pool.acquire() as conn:
-                await conn.execute(
-                    "UPDATE monitored_channels SET replacement_active = FALSE WHERE channel_id = $1",
-                    channel_id
-                )
-                
-                self.channel_replacement_status[channel_id] = False
-                channel_name = self.monitored_channels[channel_id].get('title', 'Unknown Channel')
-                return f"✅ تم تعطيل الاستبدال في القناة: **{channel_name}**"
+            await self.submit_write(lambda: self.db_pool.execute(_SQL_SET_REPLACEMENT_ACTIVE, channel_id, False))
+            self._set_replacement_status(channel_id, False)
+            channel_name = self.monitored_channels[channel_id].get('title', 'Unknown Channel')
+            return f"✅ تم تعطيل الاستبدال في القناة: **{channel_name}**"
                 
         except Exception as e:
             return f"❌ حدث خطأ: {str(e)}"
@@ -2957,26 +3187,17 @@ class TelegramEmojiBot:
             if self.db_pool is None:
                 return "❌ قاعدة البيانات غير متاحة"
                 
-            async with self.db_pool.acquire() as conn:
-                rows = await conn.fetch("""
-                    SELECT user_id, username, added_by, added_at 
-                    FROM bot_admins 
-                    WHERE is_active = TRUE 
-                    ORDER BY added_at
-                """)
-                
-                result = "👥 **قائمة المستخدمين المخولين:**\n\n"
-                for row in rows:
-                    username_display = row['username'] or 'غير معروف'
-                    added_by_display = row['added_by'] or 'النظام'
-                    added_date = row['added_at'].strftime('%Y-%m-%d') if row['added_at'] else 'غير معروف'
-                    
-                    result += f"• **معرف:** `{row['user_id']}`\n"
-                    result += f"  👤 الاسم: {username_display}\n"
-                    result += f"  ➕ أضيف بواسطة: {added_by_display}\n"
-                    result += f"  📅 التاريخ: {added_date}\n\n"
-                
-                return result
+            rows = await self.db_pool.fetch(_SQL_LIST_ADMINS)
+            
+            parts = ["👥 **قائمة المستخدمين المخولين:**\n\n"]
+            parts.extend(
+                f"• **معرف:** `{row['user_id']}`\n"
+                f"  👤 الاسم: {row['username']}\n"
+                f"  ➕ أضيف بواسطة: {row['added_by']}\n"
+                f"  📅 التاريخ: {row['added_date']}\n\n"
+                for row in rows
+            )
+            return "".join(parts)
                 
         except Exception as e:
             return f"❌ حدث خطأ: {str(e)}"
@@ -3000,7 +3221,7 @@ class TelegramEmojiBot:
             if task_id not in self.forwarding_tasks:
                 return "❌ المهمة غير موجودة"
             
-            success = await self.delete_forwarding_task(task_id)
+            success = await self.submit_write(lambda: self.delete_forwarding_task(task_id))
             return "✅ تم حذف مهمة النسخ بنجاح" if success else "❌ فشل في حذف المهمة"
             
         except Exception as e:
@@ -3017,7 +3238,7 @@ class TelegramEmojiBot:
             except ValueError:
                 return "❌ معرف المهمة يجب أن يكون رقماً"
             
-            success = await self.activate_forwarding_task(task_id)
+            success = await self.submit_write(lambda: self.activate_forwarding_task(task_id))
             return "✅ تم تفعيل مهمة النسخ بنجاح" if success else "❌ فشل في تفعيل المهمة"
             
         except Exception as e:
@@ -3034,7 +3255,7 @@ class TelegramEmojiBot:
             except ValueError:
                 return "❌ معرف المهمة يجب أن يكون رقماً"
             
-            success = await self.deactivate_forwarding_task(task_id)
+            success = await self.submit_write(lambda: self.deactivate_forwarding_task(task_id))
             return "✅ تم تعطيل مهمة النسخ بنجاح" if success else "❌ فشل في تعطيل المهمة"
             
         except Exception as e:
@@ -3061,7 +3282,11 @@ class TelegramEmojiBot:
             if user_id in self.admin_ids:
                 return "⚠️ هذا المستخدم مخول بالفعل"
             
-            success = await self.add_admin(user_id, username, self.userbot_admin_id or 6602517122)
+            success = await self.submit_write(
+                lambda: self.add_admin(user_id, username, self.userbot_admin_id or _DEFAULT_ADMIN_ID)
+            )
+            if success is None:
+                return "⚠️ هذا المستخدم مخول بالفعل"
             return f"✅ تم إضافة المستخدم {user_id} بنجاح" if success else "❌ فشل في إضافة المستخدم"
             
         except Exception as e:
@@ -3079,13 +3304,13 @@ class TelegramEmojiBot:
                 return "❌ معرف المستخدم يجب أن يكون رقماً"
             
             # Protect both the default admin and session owner
-            if user_id == 6602517122 or user_id == self.userbot_admin_id:
+            if user_id in self._protected_admins:
                 return "❌ لا يمكن حذف الأدمن الرئيسي أو صاحب الجلسة"
                 
             if user_id not in self.admin_ids:
                 return "❌ هذا المستخدم ليس مخولاً"
             
-            success = await self.remove_admin(user_id)
+            success = await self.submit_write(lambda: self.remove_admin(user_id))
             return f"✅ تم حذف المستخدم {user_id} بنجاح" if success else "❌ فشل في حذف المستخدم"
             
         except Exception as e:
@@ -3113,7 +3338,7 @@ class TelegramEmojiBot:
                     # Check bot permissions in the channel
                     try:
                         # Get the bot's participant info in the channel
-                        me = await self.client.get_me()
+                        me = await self._get_me_cached()
                         participant = await self.client.get_permissions(channel_entity, me)
                         
                         # Check if bot is admin
@@ -3220,28 +3445,32 @@ class TelegramEmojiBot:
                 await event.reply("لا توجد قنوات مراقبة محفوظة")
                 return
             
-            response = "📺 قائمة القنوات المراقبة:\n\n"
+            status_map = self.channel_replacement_status
+            channel_mappings = self.channel_emoji_mappings
+            
+            parts = ["📺 قائمة القنوات المراقبة:\n\n"]
             for channel_id, info in self.monitored_channels.items():
                 title = info['title'] or 'غير معروف'
                 username = info['username'] or 'غير متاح'
                 
                 # Get replacement status
-                is_active = self.channel_replacement_status.get(channel_id, True)
-                status_icon = "✅" if is_active else "❌"
-                status_text = "مُفعل" if is_active else "مُعطل"
+                status_label = _REPLACEMENT_STATUS_LABEL[bool(status_map.get(channel_id, True))]
                 
                 # Count replacements
-                replacement_count = len(self.channel_emoji_mappings.get(channel_id, {}))
-                
-                response += f"• **{title}**\n"
-                response += f"  📋 المعرف الرقمي: `{channel_id}`\n"
-                response += f"  🔗 اسم المستخدم: @{username}\n"
-                response += f"  🔄 الاستبدال: {status_icon} {status_text}\n"
-                response += f"  📝 الاستبدالات: {replacement_count}\n\n"
+                mappings = channel_mappings.get(channel_id)
+                replacement_count = len(mappings) if mappings else 0
+                
+                parts.append(
+                    f"• **{title}**\n"
+                    f"  📋 المعرف الرقمي: `{channel_id}`\n"
+                    f"  🔗 اسم المستخدم: @{username}\n"
+                    f"  🔄 الاستبدال: {status_label}\n"
+                    f"  📝 الاستبدالات: {replacement_count}\n\n"
+                )
             
-            response += "💡 **ملاحظة:** يمكنك استخدام اسم المستخدم (@username) أو المعرف الرقمي في جميع الأوامر"
+            parts.append("💡 **ملاحظة:** يمكنك استخدام اسم المستخدم (@username) أو المعرف الرقمي في جميع الأوامر")
             
-            await event.reply(response)
+            await event.reply("".join(parts))
             
         except Exception as e:
             logger.error(f"Failed to list channels: {e}")
@@ -3261,12 +3490,12 @@ class TelegramEmojiBot:
                 await event.reply("❌ لا يمكن العثور على القناة. تأكد من صحة المعرف أو اسم المستخدم")
                 return
             
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ القناة غير موجودة في قائمة المراقبة")
                 return
             
             # Get channel info and count of emoji replacements before deletion
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
             emoji_count = len(self.channel_emoji_mappings.get(channel_id, {}))
             
@@ -3309,7 +3538,9 @@ class TelegramEmojiBot:
             
             success = await self.add_admin(user_id, username, event.sender_id)
             
-            if success:
+            if success is None:
+                await event.reply("هذا المستخدم أدمن بالفعل")
+            elif success:
                 await event.reply(f"✅ تم إضافة الأدمن بنجاح: {user_id}")
             else:
                 await event.reply("❌ فشل في إضافة الأدمن")
@@ -3329,26 +3560,17 @@ class TelegramEmojiBot:
                 await event.reply("❌ قاعدة البيانات غير متاحة")
                 return
                 
-            async with self.db_pool.acquire() as conn:
-                rows = await conn.fetch("""
-                    SELECT user_id, username, added_by, added_at 
-                    FROM bot_admins 
-                    WHERE is_active = TRUE 
-                    ORDER BY added_at
-                """)
-                
-                response = "👥 قائمة الأدمن:\n\n"
-                for row in rows:
-                    username_display = row['username'] or 'غير معروف'
-                    added_by_display = row['added_by'] or 'النظام'
-                    added_date = row['added_at'].strftime('%Y-%m-%d') if row['added_at'] else 'غير معروف'
-                    
-                    response += f"• معرف: {row['user_id']}\n"
-                    response += f"  الاسم: {username_display}\n"
-                    response += f"  أضيف بواسطة: {added_by_display}\n"
-                    response += f"  التاريخ: {added_date}\n\n"
-                
-                await event.reply(response)
+            rows = await self.db_pool.fetch(_SQL_LIST_ADMINS)
+            
+            parts = ["👥 قائمة الأدمن:\n\n"]
+            parts.extend(
+                f"• معرف: {row['user_id']}\n"
+                f"  الاسم: {row['username']}\n"
+                f"  أضيف بواسطة: {row['added_by']}\n"
+                f"  التاريخ: {row['added_date']}\n\n"
+                for row in rows
+            )
+            await event.reply("".join(parts))
                 
         except Exception as e:
             logger.error(f"Failed to list admins: {e}")
@@ -3367,8 +3589,8 @@ class TelegramEmojiBot:
                 await event.reply("معرف المستخدم يجب أن يكون رقماً")
                 return
             
-            if user_id == 6602517122:
-                await event.reply("❌ لا يمكن حذف الأدمن الرئيسي")
+            if user_id in self._protected_admins:
+                await event.reply("❌ لا يمكن حذف الأدمن الرئيسي أو صاحب الجلسة")
                 return
                 
             if user_id not in self.admin_ids:
@@ -3451,16 +3673,13 @@ class TelegramEmojiBot:
                 return
 
             # Check if channel is monitored
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة. أضفها أولاً باستخدام أمر إضافة_قناة")
                 return
 
             # Get all custom emojis from the message
-            custom_emoji_ids = []
-            if event.message.entities:
-                for entity in event.message.entities:
-                    if isinstance(entity, MessageEntityCustomEmoji):
-                        custom_emoji_ids.append(entity.document_id)
+            custom_emoji_ids = [e.document_id for e in (event.message.entities or ()) if type(e) is _MECE]
 
             successful_replacements = []
             failed_replacements = []
@@ -3482,9 +3701,9 @@ class TelegramEmojiBot:
 
                 # Determine premium emoji ID
                 premium_emoji_id = None
-                try:
+                if premium_part.isdecimal():
                     premium_emoji_id = int(premium_part)
-                except ValueError:
+                else:
                     if custom_emoji_index < len(custom_emoji_ids):
                         premium_emoji_id = custom_emoji_ids[custom_emoji_index]
                         custom_emoji_index += 1
@@ -3504,14 +3723,12 @@ class TelegramEmojiBot:
                         new_emojis.append(normal_emoji)
 
                 # Add replacements
-                success_count = 0
-                for normal_emoji in new_emojis:
-                    success = await self.add_channel_emoji_replacement(channel_id, normal_emoji, premium_emoji_id, description)
-                    if success:
-                        success_count += 1
-
-                if success_count > 0:
-                    emoji_list = ", ".join(new_emojis[:success_count])
+                succeeded = new_emojis if await self.add_channel_emoji_replacements_bulk(
+                    channel_id, [(normal_emoji, premium_emoji_id, description) for normal_emoji in new_emojis]
+                ) else []
+
+                if succeeded:
+                    emoji_list = ", ".join(succeeded)
                     premium_emoji_markdown = f"[💎](emoji/{premium_emoji_id})"
                     successful_replacements.append(f"{emoji_list} → {premium_emoji_markdown} (ID: {premium_emoji_id})")
 
@@ -3559,10 +3776,10 @@ class TelegramEmojiBot:
                     # Try to determine premium emoji ID
                     premium_emoji_id = None
 
-                    # Method 1: Try to parse as number (ID format)
-                    try:
+                    # Method 1: Parse as number (ID format)
+                    if premium_part.isdecimal():
                         premium_emoji_id = int(premium_part)
-                    except ValueError:
+                    else:
                         # Method 2: Check if it's a premium emoji in the message
                         if custom_emoji_index < len(custom_emoji_ids):
                             premium_emoji_id = custom_emoji_ids[custom_emoji_index]
@@ -3583,20 +3800,18 @@ class TelegramEmojiBot:
                             new_emojis.append(normal_emoji)
 
                     # Add replacements only for new emojis
-                    line_success_count = 0
-                    line_failed_emojis = []
-
-                    for normal_emoji in new_emojis:
-                        success = await self.add_channel_emoji_replacement(channel_id, normal_emoji, premium_emoji_id, description)
-
-                        if success:
-                            line_success_count += 1
+                    line_succeeded, line_failed_emojis = [], []
+                    if new_emojis:
+                        if await self.add_channel_emoji_replacements_bulk(
+                            channel_id, [(normal_emoji, premium_emoji_id, description) for normal_emoji in new_emojis]
+                        ):
+                            line_succeeded = new_emojis
                         else:
-                            line_failed_emojis.append(normal_emoji)
+                            line_failed_emojis = new_emojis
 
                     # Report results for this line with premium emoji display
-                    if line_success_count > 0:
-                        emoji_list = ", ".join(new_emojis[:line_success_count])
+                    if line_succeeded:
+                        emoji_list = ", ".join(line_succeeded)
                         premium_emoji_markdown = f"[💎](emoji/{premium_emoji_id})"
                         successful_replacements.append(f"{emoji_list} → {premium_emoji_markdown} (ID: {premium_emoji_id})")
 
@@ -3609,7 +3824,6 @@ class TelegramEmojiBot:
                         failed_replacements.append(f"السطر {line_num}: فشل في حفظ {failed_emoji_list}")
 
             # Prepare response with premium emojis
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', 'Unknown Channel')
             
             response_parts = []
@@ -3660,7 +3874,8 @@ class TelegramEmojiBot:
         """Handle channel emoji replacement when replying to a message"""
         try:
             # Check if channel is monitored
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة. أضفها أولاً باستخدام أمر إضافة_قناة")
                 return
             
@@ -3669,11 +3884,7 @@ class TelegramEmojiBot:
             normal_emojis = self.extract_emojis_from_text(reply_text)
             
             # Get custom emojis from reply message
-            custom_emoji_ids = []
-            if reply_message.entities:
-                for entity in reply_message.entities:
-                    if isinstance(entity, MessageEntityCustomEmoji):
-                        custom_emoji_ids.append(entity.document_id)
+            custom_emoji_ids = [e.document_id for e in (reply_message.entities or ()) if type(e) is _MECE]
             
             if not normal_emojis and not custom_emoji_ids:
                 await event.reply("❌ الرسالة المردود عليها لا تحتوي على إيموجيات")
@@ -3712,7 +3923,6 @@ class TelegramEmojiBot:
                     failed_emojis.append(normal_emoji)
             
             # Prepare response with premium emoji display
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', 'Unknown Channel')
             
             response_parts = []
@@ -3774,11 +3984,11 @@ class TelegramEmojiBot:
                 await event.reply("❌ لا يمكن العثور على القناة. تأكد من صحة المعرف أو اسم المستخدم")
                 return
 
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة")
                 return
 
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
             
             channel_mappings = self.channel_emoji_mappings.get(channel_id, {})
@@ -3829,13 +4039,13 @@ class TelegramEmojiBot:
 
             normal_emoji = parts[1]
 
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة")
                 return
 
             success = await self.delete_channel_emoji_replacement(channel_id, normal_emoji)
             
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
 
             if success:
@@ -3866,11 +4076,11 @@ class TelegramEmojiBot:
                 await event.reply("❌ لا يمكن العثور على القناة. تأكد من صحة المعرف أو اسم المستخدم")
                 return
 
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة")
                 return
 
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
             current_count = len(self.channel_emoji_mappings.get(channel_id, {}))
 
@@ -3945,18 +4155,13 @@ class TelegramEmojiBot:
                 return
 
             # Copy replacements
-            copied_count = 0
-            failed_count = 0
-
             source_display = f"@{source_username}" if source_username else str(source_channel_id)
-            for normal_emoji, premium_emoji_id in source_mappings.items():
-                success = await self.add_channel_emoji_replacement(
-                    target_channel_id, normal_emoji, premium_emoji_id, f"نسخ من القناة {source_display}"
-                )
-                if success:
-                    copied_count += 1
-                else:
-                    failed_count += 1
+            description = f"نسخ من القناة {source_display}"
+            copied_count = await self.add_channel_emoji_replacements_bulk(
+                target_channel_id,
+                [(normal_emoji, premium_emoji_id, description) for normal_emoji, premium_emoji_id in source_mappings.items()]
+            )
+            failed_count = len(source_mappings) - copied_count
 
             source_name = self.monitored_channels[source_channel_id].get('title', source_title or 'Unknown')
             target_name = self.monitored_channels[target_channel_id].get('title', target_title or 'Unknown')
@@ -3994,23 +4199,19 @@ class TelegramEmojiBot:
                 return
 
             try:
-                async with self.db_pool.acquire() as conn:
-                    result = await conn.execute(
-                        "UPDATE monitored_channels SET replacement_active = TRUE WHERE channel_id = $1",
-                        channel_id
-                    )
+                result = await self.db_pool.execute(_SQL_SET_REPLACEMENT_ACTIVE, channel_id, True)
+                
+                if result in ['UPDATE 1', 'UPDATE 0']:
+                    # Update cache
+                    self._set_replacement_status(channel_id, True)
                     
-                    if result in ['UPDATE 1', 'UPDATE 0']:
-                        # Update cache
-                        self.channel_replacement_status[channel_id] = True
-                        
-                        channel_name = self.monitored_channels[channel_id].get('title', title or 'Unknown Channel')
-                        await event.reply(f"✅ تم تفعيل الاستبدال في القناة: **{channel_name}**")
-                        logger.info(f"Activated replacement for channel {channel_id}")
-                        return True
-                    else:
-                        await event.reply("❌ فشل في تفعيل الاستبدال")
-                        return False
+                    channel_name = self.monitored_channels[channel_id].get('title', title or 'Unknown Channel')
+                    await event.reply(f"✅ تم تفعيل الاستبدال في القناة: **{channel_name}**")
+                    logger.info(f"Activated replacement for channel {channel_id}")
+                    return True
+                else:
+                    await event.reply("❌ فشل في تفعيل الاستبدال")
+                    return False
 
             except Exception as e:
                 logger.error(f"Database error in activate_channel_replacement: {e}")
@@ -4044,23 +4245,19 @@ class TelegramEmojiBot:
                 return
 
             try:
-                async with self.db_pool.acquire() as conn:
-                    result = await conn.execute(
-                        "UPDATE monitored_channels SET replacement_active = FALSE WHERE channel_id = $1",
-                        channel_id
-                    )
+                result = await self.db_pool.execute(_SQL_SET_REPLACEMENT_ACTIVE, channel_id, False)
+                
+                if result in ['UPDATE 1', 'UPDATE 0']:
+                    # Update cache
+                    self._set_replacement_status(channel_id, False)
                     
-                    if result in ['UPDATE 1', 'UPDATE 0']:
-                        # Update cache
-                        self.channel_replacement_status[channel_id] = False
-                        
-                        channel_name = self.monitored_channels[channel_id].get('title', title or 'Unknown Channel')
-                        await event.reply(f"✅ تم تعطيل الاستبدال في القناة: **{channel_name}**")
-                        logger.info(f"Deactivated replacement for channel {channel_id}")
-                        return True
-                    else:
-                        await event.reply("❌ فشل في تعطيل الاستبدال")
-                        return False
+                    channel_name = self.monitored_channels[channel_id].get('title', title or 'Unknown Channel')
+                    await event.reply(f"✅ تم تعطيل الاستبدال في القناة: **{channel_name}**")
+                    logger.info(f"Deactivated replacement for channel {channel_id}")
+                    return True
+                else:
+                    await event.reply("❌ فشل في تعطيل الاستبدال")
+                    return False
 
             except Exception as e:
                 logger.error(f"Database error in deactivate_channel_replacement: {e}")
@@ -4080,7 +4277,7 @@ class TelegramEmojiBot:
                     await event.reply("لا توجد قنوات مراقبة")
                     return
 
-                response = "📊 حالة الاستبدال للقنوات المراقبة:\n\n"
+                parts = ["📊 حالة الاستبدال للقنوات المراقبة:\n\n"]
                 
                 for channel_id, channel_info in self.monitored_channels.items():
                     channel_name = channel_info.get('title', 'Unknown Channel')
@@ -4089,14 +4286,13 @@ class TelegramEmojiBot:
                     status_icon = "✅" if is_active else "❌"
                     status_text = "مُفعل" if is_active else "مُعطل"
                     
-                    response += f"• **{channel_name}**\n"
-                    response += f"  📋 المعرف: `{channel_id}`\n"
+                    parts.append(f"• **{channel_name}**\n  📋 المعرف: `{channel_id}`\n")
                     if username:
-                        response += f"  🔗 اسم المستخدم: @{username}\n"
-                    response += f"  🔄 الحالة: {status_icon} {status_text}\n\n"
+                        parts.append(f"  🔗 اسم المستخدم: @{username}\n")
+                    parts.append(f"  🔄 الحالة: {status_icon} {status_text}\n\n")
 
-                response += "💡 **ملاحظة:** يمكنك فحص قناة محددة باستخدام: حالة_استبدال_قناة <معرف_أو_اسم_مستخدم>"
-                await event.reply(response)
+                parts.append("💡 **ملاحظة:** يمكنك فحص قناة محددة باستخدام: حالة_استبدال_قناة <معرف_أو_اسم_مستخدم>")
+                await event.reply("".join(parts))
                 return
 
             # Resolve channel identifier
@@ -4106,11 +4302,11 @@ class TelegramEmojiBot:
                 await event.reply("❌ لا يمكن العثور على القناة. تأكد من صحة المعرف أو اسم المستخدم")
                 return
 
-            if channel_id not in self.monitored_channels:
+            channel_info = self.monitored_channels.get(channel_id)
+            if channel_info is None:
                 await event.reply("❌ هذه القناة غير مراقبة")
                 return
 
-            channel_info = self.monitored_channels[channel_id]
             channel_name = channel_info.get('title', title or 'Unknown Channel')
             channel_username = channel_info.get('username', username)
             is_active = self.channel_replacement_status.get(channel_id, True)
@@ -4226,7 +4422,7 @@ class TelegramEmojiBot:
                 await event.reply("لا توجد مهام توجيه محفوظة")
                 return
 
-            response = "📋 قائمة مهام النسخ:\n\n"
+            parts = ["📋 قائمة مهام النسخ:\n\n"]
             
             for task_id, task_info in self.forwarding_tasks.items():
                 source_id = task_info['source']
@@ -4241,18 +4437,20 @@ class TelegramEmojiBot:
                 status_icon = "✅" if is_active else "❌"
                 status_text = "مُفعلة" if is_active else "مُعطلة"
 
-                response += f"🆔 المهمة: {task_id}\n"
-                response += f"📤 من: {source_name} ({source_id})\n"
-                response += f"📥 إلى: {target_name} ({target_id})\n"
-                response += f"🔄 الحالة: {status_icon} {status_text}\n"
-                response += f"⏱️ التأخير: {delay} ثانية\n"
+                parts.append(
+                    f"🆔 المهمة: {task_id}\n"
+                    f"📤 من: {source_name} ({source_id})\n"
+                    f"📥 إلى: {target_name} ({target_id})\n"
+                    f"🔄 الحالة: {status_icon} {status_text}\n"
+                    f"⏱️ التأخير: {delay} ثانية\n"
+                )
                 
                 if description:
-                    response += f"📝 الوصف: {description}\n"
+                    parts.append(f"📝 الوصف: {description}\n")
                 
-                response += "\n"
+                parts.append("\n")
 
-            await event.reply(response)
+            await event.reply("".join(parts))
 
         except Exception as e:
             logger.error(f"Failed to list forwarding tasks: {e}")
@@ -4400,41 +4598,29 @@ class TelegramEmojiBot:
                 await event.reply("❌ قاعدة البيانات غير متاحة")
                 return
 
-            async with self.db_pool.acquire() as conn:
-                # Update delay in database
-                result = await conn.execute(
-                    "UPDATE forwarding_tasks SET delay_seconds = $1 WHERE id = $2",
-                    delay_seconds, task_id
-                )
-                
-                if result == 'UPDATE 1':
-                    # Update cache if task is active
-                    if task_id in self.forwarding_tasks:
-                        self.forwarding_tasks[task_id]['delay'] = delay_seconds
-                        
-                        task_info = self.forwarding_tasks[task_id]
-                        source_name = self.monitored_channels.get(task_info['source'], {}).get('title', 'Unknown')
-                        target_name = self.monitored_channels.get(task_info['target'], {}).get('title', 'Unknown')
-                    else:
-                        # Get task info from database
-                        task_row = await conn.fetchrow("SELECT source_channel_id, target_channel_id FROM forwarding_tasks WHERE id = $1", task_id)
-                        if task_row:
-                            source_name = self.monitored_channels.get(task_row['source_channel_id'], {}).get('title', 'Unknown')
-                            target_name = self.monitored_channels.get(task_row['target_channel_id'], {}).get('title', 'Unknown')
-                        else:
-                            source_name = "Unknown"
-                            target_name = "Unknown"
-                    
-                    if delay_seconds > 0:
-                        await event.reply(f"✅ تم تحديث تأخير المهمة {task_id} بنجاح!\n📤 من: {source_name}\n📥 إلى: {target_name}\n⏱️ التأخير الجديد: {delay_seconds} ثانية")
-                    else:
-                        await event.reply(f"✅ تم تحديث تأخير المهمة {task_id} بنجاح!\n📤 من: {source_name}\n📥 إلى: {target_name}\n⏱️ التأخير: فوري (بدون تأخير)")
-                    
-                    logger.info(f"Updated forwarding task {task_id} delay to {delay_seconds} seconds")
-                    return True
-                else:
-                    await event.reply("❌ المهمة غير موجودة")
-                    return False
+            # Update delay in database; the returned row doubles as the existence check
+            task_row = await self.db_pool.fetchrow(_SQL_SET_FORWARDING_TASK_DELAY, delay_seconds, task_id)
+            
+            if task_row is None:
+                await event.reply("❌ المهمة غير موجودة")
+                return False
+            
+            # Update cache if task is active
+            task_info = self.forwarding_tasks.get(task_id)
+            if task_info is not None:
+                self._delayed_task_count += (delay_seconds > 0) - (task_info['delay'] > 0)
+                task_info['delay'] = delay_seconds
+            
+            source_name = self.monitored_channels.get(task_row['source_channel_id'], {}).get('title', 'Unknown')
+            target_name = self.monitored_channels.get(task_row['target_channel_id'], {}).get('title', 'Unknown')
+            
+            if delay_seconds > 0:
+                await event.reply(f"✅ تم تحديث تأخير المهمة {task_id} بنجاح!\n📤 من: {source_name}\n📥 إلى: {target_name}\n⏱️ التأخير الجديد: {delay_seconds} ثانية")
+            else:
+                await event.reply(f"✅ تم تحديث تأخير المهمة {task_id} بنجاح!\n📤 من: {source_name}\n📥 إلى: {target_name}\n⏱️ التأخير: فوري (بدون تأخير)")
+            
+            logger.info(f"Updated forwarding task {task_id} delay to {delay_seconds} seconds")
+            return True
 
         except Exception as e:
             logger.error(f"Failed to update forwarding task delay: {e}")
@@ -4462,7 +4648,7 @@ class TelegramEmojiBot:
 
                     try:
                         # Get the bot's participant info in the channel
-                        me = await self.client.get_me()
+                        me = await self._get_me_cached()
                         participant = await self.client.get_permissions(channel_entity, me)
 
                         # Format and display permissions
@@ -4709,10 +4895,7 @@ class TelegramEmojiBot:
             if event.message.is_reply:
                 reply_msg = await event.message.get_reply_message()
                 if reply_msg and reply_msg.entities:
-                    custom_emojis = []
-                    for entity in reply_msg.entities:
-                        if isinstance(entity, MessageEntityCustomEmoji):
-                            custom_emojis.append(entity.document_id)
+                    custom_emojis = [e.document_id for e in (reply_msg.entities or ()) if type(e) is _MECE]
                     
                     if custom_emojis:
                         # Build response with actual premium emojis
@@ -4752,10 +4935,7 @@ class TelegramEmojiBot:
             
             # Check for custom emojis in the current message
             if event.message.entities:
-                custom_emojis = []
-                for entity in event.message.entities:
-                    if isinstance(entity, MessageEntityCustomEmoji):
-                        custom_emojis.append(entity.document_id)
+                custom_emojis = [e.document_id for e in (event.message.entities or ()) if type(e) is _MECE]
                 
                 if custom_emojis:
                     # Build response with actual premium emojis
@@ -4833,9 +5013,9 @@ class TelegramEmojiBot:
                 # Check if message is from a monitored channel
                 try:
                     event_peer_id = utils.get_peer_id(event.chat)
-                    if event_peer_id and event_peer_id in self.monitored_channels:
-                        message_text = event.message.text or event.message.message or ""
-                        logger.info(f"Processing message in monitored channel {event_peer_id}: {message_text}")
+                    if event_peer_id and event_peer_id in self._monitored_ids:
+                        # Raw text: message.text would render markdown just for this log line
+                        logger.debug("Processing message in monitored channel %s: %s", event_peer_id, event.message.message)
                         
                         # Handle emoji replacement first (only for original messages in source channels)
                         await self.replace_emojis_in_message(event)
@@ -4856,11 +5036,11 @@ class TelegramEmojiBot:
                                 # Check if the message has premium emojis (indicating successful replacement)
                                 if updated_message.entities:
                                     has_premium_emojis = any(
-                                        isinstance(entity, MessageEntityCustomEmoji) 
+                                        type(entity) is _MECE 
                                         for entity in updated_message.entities
                                     )
                                     if has_premium_emojis:
-                                        logger.info(f"Successfully retrieved updated message with premium emojis for forwarding")
+                                        logger.info("Successfully retrieved updated message with premium emojis for forwarding")
                                         break
                                 
                                 if attempt < 2:  # Don't sleep on the last attempt
@@ -4872,7 +5052,7 @@ class TelegramEmojiBot:
                             updated_message = event.message
                         
                         await self.forward_message_to_targets(event_peer_id, updated_message)
-                        logger.info(f"Finished processing message in channel {event_peer_id}")
+                        logger.info("Finished processing message in channel %s", event_peer_id)
                 except Exception as e:
                     logger.error(f"Error processing channel message: {e}")
                     
@@ -4885,8 +5065,8 @@ class TelegramEmojiBot:
             try:
                 # Check if edited message is from a monitored channel
                 event_peer_id = utils.get_peer_id(event.chat)
-                if event_peer_id in self.monitored_channels:
-                    logger.info(f"Message edited in monitored channel {event_peer_id}")
+                if event_peer_id in self._monitored_ids:
+                    logger.info("Message edited in monitored channel %s", event_peer_id)
                     # Only replace emojis in source channel messages, not in copied messages
                     await self.replace_emojis_in_message(event)
                     
@@ -4921,10 +5101,11 @@ class TelegramEmojiBot:
             logger.info("Telegram client started and authorized successfully")
             
             # Get bot info
-            me = await self.client.get_me()
+            me = self._me = await self.client.get_me()
             first_name = getattr(me, 'first_name', 'Unknown User')
             username = getattr(me, 'username', None) or 'Unknown'
             self.userbot_admin_id = me.id  # Set the session owner ID
+            self._refresh_authorized_ids()
             logger.info(f"Bot started as: {first_name} (@{username}) - ID: {self.userbot_admin_id}")
             
             # Set up bot commands for Telegram Business shortcuts
@@ -4933,8 +5114,9 @@ class TelegramEmojiBot:
             # Setup event handlers
             self.setup_event_handlers()
             
-            # Start command queue processor
-            asyncio.create_task(self.start_command_queue_processor())
+            # Start the database writer, then the command queue processor that feeds it
+            self._writer_task = asyncio.create_task(self._db_writer())
+            self._queue_processor_task = asyncio.create_task(self.start_command_queue_processor())
             
             logger.info("Bot is now running and monitoring channels...")
             logger.info("Command queue processor started for Control Bot integration")
@@ -4950,11 +5132,6 @@ class TelegramEmojiBot:
         except Exception as e:
             logger.error(f"Failed to start bot: {e}")
             raise
-        finally:
-            # Clean up
-            if self.db_pool:
-                await self.db_pool.close()
-            logger.info("Bot stopped")
 
     async def stop(self):
         """Stop the bot"""
@@ -4969,8 +5146,33 @@ class TelegramEmojiBot:
         except Exception as e:
             logger.error(f"Failed to disconnect client: {e}")
         
+        # Stop the command queue processor first so it can't feed the writer or re-subscribe
+        if self._queue_processor_task is not None:
+            processor_task, self._queue_processor_task = self._queue_processor_task, None
+            processor_task.cancel()
+            await asyncio.gather(processor_task, return_exceptions=True)
+        
+        if self._writer_task is not None:
+            writer_task, self._writer_task = self._writer_task, None
+            writer_task.cancel()
+            # Let the writer fail its queued writes before the pool closes
+            await asyncio.gather(writer_task, return_exceptions=True)
+        
         if self.db_pool:
+            # Pool.close() waits for every acquired connection, so the listener must go back first
+            if self._listen_conn is not None:
+                try:
+                    await self._listen_conn.remove_listener(_COMMAND_QUEUE_CHANNEL, self._on_command_notify)
+                except Exception as e:
+                    logger.error(f"Failed to remove command queue listener: {e}")
+                try:
+                    await self.db_pool.release(self._listen_conn)
+                except Exception as e:
+                    logger.error(f"Failed to release command queue listener: {e}")
+                self._listen_conn = None
             await self.db_pool.close()
+        
+        logger.info("Bot stopped")
 
 # Main execution
 async def main():
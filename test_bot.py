@@ -218,6 +218,28 @@ async def test_emoji_extraction():
         print(f"  ❌ Emoji extraction error: {e}")
         return False
 
+async def test_fallback_symbol_extraction():
+    """Test that fallback symbols inside longer emoji sequences are still extracted"""
+    print("🧪 Testing fallback symbol extraction...")
+    
+    try:
+        from telegram_bot import TelegramEmojiBot
+        
+        # VS16 forms match as a whole, so the bare base symbol goes through the fallback
+        found_emojis = TelegramEmojiBot.extract_emojis_from_text(None, "go ➡️ now")
+        print(f"  'go ➡️ now' -> {found_emojis}")
+        
+        if "➡️" not in found_emojis or "➡" not in found_emojis:
+            print("  ❌ Expected both the VS16 form and its base symbol")
+            return False
+        
+        print("  ✅ Fallback symbol extraction works")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Fallback symbol extraction error: {e}")
+        return False
+
 async def run_all_tests():
     """Run all tests"""
     print("🚀 Starting Telegram Bot Tests")
@@ -229,6 +251,7 @@ async def run_all_tests():
         ("Database Connectivity", test_database_connectivity),
         ("Bot Class Structure", test_bot_class_structure),
         ("Emoji Extraction", test_emoji_extraction),
+        ("Fallback Symbol Extraction", test_fallback_symbol_extraction),
     ]
     
     results = {}